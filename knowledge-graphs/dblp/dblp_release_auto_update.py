@@ -1,59 +1,117 @@
 #!/usr/bin/env python3
-import yaml
 import requests
-from datetime import datetime, date
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 import hashlib
 import os
+import sys
 
 # Path to your YAML file
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 YAML_FILE = os.path.join(SCRIPT_DIR, "metadata.yaml")
 
+# Shared helpers live in the repository's scripts/ folder
+sys.path.insert(0, os.path.join(SCRIPT_DIR, "..", "..", "scripts"))
+
+from kg_metadata import append_versions, latest_version, load_metadata, parse_version_date  # noqa: E402
+
 # Base URL to check DBLP RDF releases
 BASE_URL = "https://drops.dagstuhl.de/storage/artifacts/dblp/rdf"
 
-def get_current_yaml_version():
-    """Reads the YAML and returns the latest version date and the YAML data."""
-    if not os.path.exists(YAML_FILE):
-        raise FileNotFoundError(f"{YAML_FILE} not found")
+# Release URL of the monthly snapshot; other artifacts derive theirs from
+# the file URL of their latest version
+DEFAULT_URL_TEMPLATE = BASE_URL + "/{date:%Y}/dblp-{date:%Y-%m-%d}.nt.gz"
 
-    with open(YAML_FILE, "r") as f:
-        data = yaml.safe_load(f)
+# Concurrent HEAD requests, shared by all artifacts
+PROBE_WORKERS = 8
 
-    latest_version_entry = data['artifacts'][0]['versions'][-1]
-    latest_version_str = str(latest_version_entry['version'])  # e.g., "2025-10-01"
-    latest_version_date = datetime.strptime(latest_version_str, "%Y-%m-%d").date()
+# Months to look back for artifacts without a dated version
+MAX_LOOKBACK_MONTHS = 12
 
-    return latest_version_date, data
+def create_session():
+    """One pooled session for all release probes."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=PROBE_WORKERS, pool_maxsize=PROBE_WORKERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
-def fetch_latest_release_date():
-    """Checks the latest available release by querying the URL pattern."""
-    today = date.today()
-    year, month = today.year, today.month
+def next_month(day):
+    return date(day.year + day.month // 12, day.month % 12 + 1, 1)
 
-    # Try current month first
-    candidate_date = date(year, month, 1)
-    url = f"{BASE_URL}/{year}/dblp-{year}-{month:02d}-01.nt.gz"
-
-    response = requests.head(url)
-    if response.status_code == 200:
-        size = int(response.headers.get("Content-Length", 0))
-        return candidate_date, url, size
+def months_after(latest, today):
+    """First days of every month after `latest` up to today's month."""
+    if latest is None:
+        first = today.year * 12 + today.month - MAX_LOOKBACK_MONTHS
+        month = date(first // 12, first % 12 + 1, 1)
     else:
-        # fallback: check previous month
-        if month == 1:
-            prev_year, prev_month = year - 1, 12
-        else:
-            prev_year, prev_month = year, month - 1
+        month = next_month(latest)
+
+    while month <= today:
+        yield month
+        month = next_month(month)
+
+def url_template(artifact, index):
+    """Release URL template of an artifact, with {date} placeholders."""
+    entry = latest_version(artifact)
+    distributions = (entry or {}).get("distributions") or []
+    file_url = distributions[0].get("file") if distributions else None
+
+    if file_url:
+        version_date = parse_version_date(entry["version"])
+        template = file_url.replace(f"{version_date:%Y-%m-%d}", "{date:%Y-%m-%d}")
+        template = template.replace(f"/{version_date:%Y}/", "/{date:%Y}/")
+        if "{date:%Y-%m-%d}" in template:
+            return template
+
+    return DEFAULT_URL_TEMPLATE if index == 0 else None
+
+def probe_release(url, session):
+    """HEAD a candidate release. Returns its size, or None if it does not exist."""
+    try:
+        response = session.head(url, allow_redirects=True, timeout=30)
+    except requests.RequestException as e:
+        print(f"Could not check {url}: {e}")
+        return None
+
+    if response.status_code != 200:
+        return None
+
+    return int(response.headers.get("Content-Length", 0))
+
+def find_new_releases(data, session=requests, today=None, executor=ThreadPoolExecutor):
+    """
+    Probes every month after each artifact's latest version concurrently.
+    Returns (artifact, date, url, size) for all found snapshots in date order.
+    """
+    today = today or date.today()
+    candidates = []
+
+    for index, artifact in enumerate(data.get("artifacts") or []):
+        template = url_template(artifact, index)
+        if template is None:
+            print(f"No release URL pattern for {artifact.get('artifact')}, skipping.")
+            continue
+
+        entry = latest_version(artifact)
+        latest = parse_version_date(entry["version"]) if entry else None
 
-        candidate_date = date(prev_year, prev_month, 1)
-        url = f"{BASE_URL}/{prev_year}/dblp-{prev_year}-{prev_month:02d}-01.nt.gz"
-        response = requests.head(url)
-        if response.status_code == 200:
-            size = int(response.headers.get("Content-Length", 0))
-            return candidate_date, url, size
+        for month in months_after(latest, today):
+            candidates.append((artifact, month, template.format(date=month)))
 
-    return None, None, 0
+    print(f"Checking {len(candidates)} candidate DBLP releases...")
+
+    with executor(max_workers=PROBE_WORKERS) as pool:
+        sizes = list(pool.map(lambda candidate: probe_release(candidate[2], session), candidates))
+
+    found = [
+        (artifact, month, url, size)
+        for (artifact, month, url), size in zip(candidates, sizes)
+        if size is not None
+    ]
+
+    return sorted(found, key=lambda release: release[1])
 
 def calculate_sha256(url):
     """Downloads file in chunks to calculate sha256."""
@@ -64,21 +122,25 @@ def calculate_sha256(url):
             h.update(chunk)
     return h.hexdigest()
 
-def update_yaml(new_date, url, size, data):
-    """Adds a new version entry to the YAML."""
-    new_version_str = new_date.strftime("%Y-%m-%d")
-    new_version_entry = {
+def create_version_entry(new_date, url, size, data, artifact=None):
+    """Builds a new version entry for the YAML."""
+    # abstract, format and compression follow the artifact's latest version
+    latest = (latest_version(artifact) or {}) if artifact else {}
+    distributions = latest.get("distributions") or []
+    previous = distributions[0] if distributions else {}
+
+    abstract = latest.get("abstract") or (
+        "This file contains all the dblp data in a single file. "
+        "The dblp computer science bibliography is the open indexing service "
+        "and knowledge graph of the computer science community."
+    )
+
+    return {
         "version": new_date,
-        "title": "Monthly Snapshot",
-        "abstract": (
-            "This file contains all the dblp data in a single file. "
-            "The dblp computer science bibliography is the open indexing service "
-            "and knowledge graph of the computer science community. "
-        ),
+        "title": (artifact or {}).get("title", "Monthly Snapshot"),
+        "abstract": abstract,
         "description": (
-            "This file contains all the dblp data in a single file. "
-            "The dblp computer science bibliography is the open indexing service "
-            "and knowledge graph of the computer science community. "
+            f"{abstract.rstrip()} "
             "This version and its metadata have been **automatically retrieved and published** by an automated update process.\n\n"
             "Found an issue? Update metadata: https://github.com/m1ci/lod-next-gen/blob/main/knowledge-graphs/dblp/metadata.yaml"
         ),
@@ -86,8 +148,8 @@ def update_yaml(new_date, url, size, data):
         "distributions": [
             {
                 "file": url,
-                "format": "nt",
-                "compression": "gz",
+                "format": previous.get("format", "nt"),
+                "compression": previous.get("compression", "gz"),
                 "size": size,
                 "sha256": None,
                 "status": "pending"
@@ -95,26 +157,44 @@ def update_yaml(new_date, url, size, data):
         ]
     }
 
-    data['artifacts'][0]['versions'].append(new_version_entry)
+def release_proposals(releases, data):
+    """Version entries for the found releases, in daily_check.py's proposal format."""
+    return [
+        {
+            "artifact": artifact['artifact'],
+            "entry": create_version_entry(new_date, url, size, data, artifact)
+        }
+        for artifact, new_date, url, size in releases
+    ]
+
+def update_yaml(releases, data):
+    """Adds the new version entries to the YAML, leaving the rest of the file untouched."""
+    append_versions(YAML_FILE, release_proposals(releases, data))
 
-    with open(YAML_FILE, "w") as f:
-        yaml.dump(data, f, sort_keys=False)
+    for artifact, new_date, url, size in releases:
+        print(f"YAML updated with new {artifact['artifact']} version {new_date:%Y-%m-%d}, size: {size} bytes")
 
-    print(f"YAML updated with new version {new_version_str}, size: {size} bytes")
+def check(metadata, context):
+    """Plugin entry point for daily_check.py; returns the proposed new versions."""
+    releases = find_new_releases(metadata, context.session, executor=context.executor)
+
+    if not releases:
+        print("DBLP YAML is already up to date. No new version found.")
+        return []
+
+    for artifact, new_date, url, size in releases:
+        print(f"New DBLP release found: {artifact['artifact']} {new_date}")
+    return release_proposals(releases, metadata)
 
 def main():
-    current_version_date, data = get_current_yaml_version()
-    latest_release_date, url, size = fetch_latest_release_date()
+    data = load_metadata(YAML_FILE)
+    releases = find_new_releases(data, create_session())
 
-    if latest_release_date is None:
-        print("No new DBLP release found.")
+    if not releases:
+        print("DBLP YAML is already up to date. No new version found.")
         return
 
-    if latest_release_date > current_version_date:
-        print(f"New DBLP release found: {latest_release_date}")
-        update_yaml(latest_release_date, url, size, data)
-    else:
-        print("DBLP YAML is already up to date. No new version found.")
+    update_yaml(releases, data)
 
 if __name__ == "__main__":
     main()
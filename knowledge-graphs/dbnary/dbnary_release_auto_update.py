@@ -2,45 +2,78 @@
 
 import os
 import re
-import yaml
+import sys
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 YAML_FILE = os.path.join(SCRIPT_DIR, "metadata.yaml")
 
-BASE_URL = "https://kaiko.getalp.org/static/ontolex/en/"
+# Shared helpers live in the repository's scripts/ folder
+sys.path.insert(0, os.path.join(SCRIPT_DIR, "..", "..", "scripts"))
 
+from autoindex import listing_url, parse_listing  # noqa: E402
+from kg_metadata import append_versions, load_metadata  # noqa: E402
 
-SUPPORTED_ARTIFACTS = [
-    "en_dbnary_ontolex_",
-    "en_dbnary_enhancement_",
-    "en_dbnary_morphology_",
-    "en_dbnary_lime_",
-    "en_dbnary_statistics_",
-    "en_dbnary_etymology_",
-    "en_dbnary_exolex_ontolex_",
-    "en_dbnary_exolex_lime_",
-]
+# One directory per language edition (en/, fr/, ...)
+ROOT_URL = "https://kaiko.getalp.org/static/ontolex/"
+
+LANGUAGE_PATTERN = re.compile(
+    r"[a-z]{2,3}"
+)
+
+
+# Release file names: artifact prefix + release date
+RELEASE_PATTERN = re.compile(
+    r"([\w-]+?_)(\d{8})\.ttl\.bz2"
+)
+
+# Concurrent HEAD requests for candidate releases
+PROBE_WORKERS = 8
+
+# Language listings scanned at the same time
+LANGUAGE_WORKERS = 8
+
+# metadata.yaml key holding, per language, the ETag / Last-Modified
+# of the last fully processed index page (for conditional GETs)
+LISTING_CACHE_KEY = "release-listing-cache"
+
+# metadata.yaml key listing extra languages whose artifacts are
+# created automatically ("all" for every language on the server).
+# Languages of existing artifacts are always checked.
+LANGUAGES_KEY = "dbnary-languages"
+
+
+def language_url(language):
+    return ROOT_URL + language + "/"
+
+
+def artifact_language(prefix):
+    return prefix.split("_", 1)[0]
 
 
 def load_yaml():
     if not os.path.exists(YAML_FILE):
         raise FileNotFoundError(YAML_FILE)
 
-    with open(YAML_FILE, "r") as f:
-        return yaml.safe_load(f)
+    return load_metadata(
+        YAML_FILE
+    )
 
 
-def save_yaml(data):
-    with open(YAML_FILE, "w") as f:
-        yaml.dump(
-            data,
-            f,
-            sort_keys=False,
-            allow_unicode=True
-        )
+def save_updates(proposals, settings):
+    """
+    Inserts the new versions into metadata.yaml
+    without re-emitting the unchanged content.
+    """
+
+    append_versions(
+        YAML_FILE,
+        proposals,
+        settings
+    )
 
 
 def normalize_date(value):
@@ -107,27 +140,74 @@ def get_latest_version_metadata(artifact):
     )
 
 
-def get_available_versions(prefix):
+def fetch_listing(
+    url,
+    session=requests,
+    cache=None
+):
     """
-    Finds all available DBnary releases for one artifact.
+    Downloads a DBnary index page once.
+    Returns (html, validators); html is None if the
+    page did not change since the cached validators.
     """
 
-    response = requests.get(
-        BASE_URL
+    headers = {}
+
+    if cache:
+        if cache.get("etag"):
+            headers["If-None-Match"] = cache["etag"]
+
+        if cache.get("last-modified"):
+            headers["If-Modified-Since"] = cache["last-modified"]
+
+
+    response = session.get(
+        listing_url(url),
+        headers=headers,
+        timeout=60
     )
 
+
+    if response.status_code == 304:
+        return None, cache
+
+
     response.raise_for_status()
 
-    html = response.text
 
-    pattern = re.compile(
-        re.escape(prefix) +
-        r"(\d{8})\.ttl\.bz2"
-    )
+    validators = {
+        "etag": response.headers.get("ETag"),
+        "last-modified": response.headers.get("Last-Modified")
+    }
+
 
-    releases = []
+    return response.text, validators
+
+
+def index_releases(html, base_url):
+    """
+    Parses an index page in a single pass into
+    prefix -> sorted list of (date, url, size).
+    size is None unless the listing shows the
+    exact byte count.
+    """
+
+    index = {}
+
+    for filename, listed in parse_listing(
+        html,
+        base_url
+    ).items():
+
+        match = RELEASE_PATTERN.fullmatch(
+            filename
+        )
+
+        if not match:
+            continue
+
+        prefix, date_string = match.groups()
 
-    for date_string in pattern.findall(html):
 
         # Ignore invalid historical dates
         try:
@@ -144,45 +224,92 @@ def get_available_versions(prefix):
             continue
 
 
-        filename = (
-            prefix +
-            date_string +
-            ".ttl.bz2"
+        index.setdefault(
+            prefix,
+            []
+        ).append(
+            (
+                version_date,
+                listed["url"],
+                listed["size"] if listed["exact"] else None
+            )
         )
 
-        url = BASE_URL + filename
 
+    for releases in index.values():
+        releases.sort()
 
-        try:
-            head = requests.head(
-                url,
-                timeout=20
-            )
 
-            size = int(
-                head.headers.get(
-                    "Content-Length",
-                    0
-                )
+    return index
+
+
+def probe_size(url, session=requests):
+    """
+    Reads the file size of a release via HEAD.
+    """
+
+    try:
+        head = session.head(
+            url,
+            timeout=20
+        )
+
+        return int(
+            head.headers.get(
+                "Content-Length",
+                0
             )
+        )
 
-        except Exception:
-            size = 0
+    except Exception:
+        return 0
 
 
-        releases.append(
-            {
-                "version": version_date,
-                "url": url,
-                "size": size
-            }
+def get_available_versions(
+    prefix,
+    index,
+    session=requests,
+    newer_than=None,
+    executor=ThreadPoolExecutor
+):
+    """
+    Finds the DBnary releases of one artifact that are
+    newer than `newer_than`. Releases without an exact
+    size in the listing are probed concurrently via HEAD.
+    """
+
+    candidates = [
+        (version_date, url, size)
+        for version_date, url, size in index.get(prefix, [])
+        if newer_than is None
+        or version_date > newer_than
+    ]
+
+
+    with executor(
+        max_workers=PROBE_WORKERS
+    ) as pool:
+
+        sizes = list(
+            pool.map(
+                lambda candidate: (
+                    candidate[2]
+                    if candidate[2] is not None
+                    else probe_size(candidate[1], session)
+                ),
+                candidates
+            )
         )
 
 
-    return sorted(
-        releases,
-        key=lambda x: x["version"]
-    )
+    return [
+        {
+            "version": version_date,
+            "url": url,
+            "size": size
+        }
+        for (version_date, url, _), size in zip(candidates, sizes)
+    ]
 
 
 def get_next_version(
@@ -273,14 +400,26 @@ def get_artifact_id(artifact):
     )
 
 
-def process_artifact(artifact):
+def process_artifact(
+    artifact,
+    index,
+    session=requests,
+    catch_up=True,
+    executor=ThreadPoolExecutor
+):
+    """
+    Returns (entries, up_to_date): the version entries
+    for all missing releases of an artifact in date
+    order (only the next one if catch_up is False),
+    and whether no further release is left after them.
+    """
 
     artifact_id = get_artifact_id(
         artifact
     )
 
     if not artifact_id:
-        return
+        return [], True
 
 
     prefix = artifact_id
@@ -289,8 +428,8 @@ def process_artifact(artifact):
         prefix += "_"
 
 
-    if prefix not in SUPPORTED_ARTIFACTS:
-        return
+    if prefix not in index:
+        return [], True
 
 
     print(
@@ -310,66 +449,415 @@ def process_artifact(artifact):
 
 
     available = get_available_versions(
-        prefix
+        prefix,
+        index,
+        session,
+        newer_than=current_version,
+        executor=executor
     )
 
 
     print(
-        "Available releases:",
+        "New releases:",
         len(available)
     )
 
 
-    new_version = get_next_version(
-        current_version,
-        available
-    )
+    if catch_up:
+        new_versions = available
+    else:
+        new_version = get_next_version(
+            current_version,
+            available
+        )
+        new_versions = [new_version] if new_version else []
 
 
-    if not new_version:
+    if not new_versions:
         print(
             "No update available."
         )
-        return
+        return [], True
 
 
-    print(
-        "Adding version:",
-        new_version["version"]
+    for new_version in new_versions:
+        print(
+            "Adding version:",
+            new_version["version"]
+        )
+
+
+    up_to_date = (
+        new_versions[-1]["version"]
+        == available[-1]["version"]
     )
 
 
-    entry = create_version_entry(
-        artifact,
-        new_version
+    return [
+        create_version_entry(
+            artifact,
+            new_version
+        )
+        for new_version in new_versions
+    ], up_to_date
+
+
+def discover_languages(session=requests):
+    """
+    Lists the language directories on the server.
+    """
+
+    response = session.get(
+        listing_url(ROOT_URL),
+        timeout=60
     )
 
+    response.raise_for_status()
+
 
-    artifact["versions"].append(
-        entry
+    return sorted(
+        {
+            filename
+            for filename in parse_listing(
+                response.text,
+                ROOT_URL
+            )
+            if LANGUAGE_PATTERN.fullmatch(filename)
+        }
     )
 
 
-def main():
+def get_languages(data, session=requests):
+    """
+    Returns (languages to check, languages whose
+    missing artifacts are created).
+    """
 
-    data = load_yaml()
+    existing = {
+        artifact_language(get_artifact_id(artifact))
+        for artifact in data.get("artifacts", [])
+        if get_artifact_id(artifact)
+    }
+
+
+    extra = data.get(LANGUAGES_KEY) or []
+
+    if extra == "all":
+        extra = discover_languages(session)
+
+    # a single language or a comma separated list
+    elif isinstance(extra, str):
+        extra = extra.split(",")
+
+    extra = {
+        str(language).strip()
+        for language in extra
+        if str(language).strip()
+    }
+
+
+    return sorted(existing | extra), extra
+
+
+def scan_language(language, session, cache):
+    """
+    Fetches and indexes one language listing.
+    Returns (index or None if unchanged, validators);
+    a listing that cannot be fetched is reported and
+    returns (None, None), so the other languages are
+    still checked.
+    """
+
+    try:
+        html, validators = fetch_listing(
+            language_url(language),
+            session,
+            cache
+        )
+
+    except requests.RequestException as e:
+        print(
+            f"⚠️ Could not fetch the index page for '{language}': {e}"
+        )
+        return None, None
+
+    if html is None:
+        print(
+            f"Index page for '{language}' unchanged."
+        )
+        return None, validators
+
+
+    return index_releases(
+        html,
+        language_url(language)
+    ), validators
+
+
+def create_artifact(prefix):
+    """
+    Creates a new per-language artifact.
+    """
+
+    artifact_id = prefix.rstrip("_")
+
+    language = artifact_language(prefix)
+
+    kind = artifact_id.split("_dbnary_", 1)[-1]
+
+
+    text = (
+        f"The DBnary {kind} dataset extracted from the "
+        f"'{language}' Wiktionary edition."
+    )
+
+
+    return {
+        "artifact": artifact_id,
+        "title": artifact_id,
+        "abstract": text,
+        "description": text,
+        "versions": []
+    }
+
+
+def find_updates(
+    data,
+    session=requests,
+    catch_up=True,
+    executor=ThreadPoolExecutor
+):
+    """
+    Scans the index page of every language once,
+    concurrently, and returns (artifact, entry) pairs,
+    covering every missing release in catch-up mode.
+
+    Artifacts of languages listed under dbnary-languages
+    that are not in the metadata yet are created with
+    their latest release; their `artifact` dicts are
+    new and not part of data["artifacts"].
+
+    Stores each page's validators in the metadata once
+    every artifact of that language caught up with it.
+    """
+
+    languages, extra = get_languages(
+        data,
+        session
+    )
+
+    # Older runs stored the validators of the English page only
+    cache = {
+        language: validators
+        for language, validators in (
+            data.get(LISTING_CACHE_KEY) or {}
+        ).items()
+        if isinstance(validators, dict)
+    }
+
+
+    with executor(
+        max_workers=LANGUAGE_WORKERS
+    ) as pool:
+
+        scans = dict(
+            zip(
+                languages,
+                pool.map(
+                    lambda language: scan_language(
+                        language,
+                        session,
+                        cache.get(language)
+                    ),
+                    languages
+                )
+            )
+        )
 
 
+    index = {}
+
+    for language_index, _ in scans.values():
+        index.update(language_index or {})
+
+
+    updates = []
+
+    caught_up = {
+        language: True
+        for language in languages
+    }
+
+    known = set()
+
     for artifact in data.get(
         "artifacts",
         []
     ):
 
-        process_artifact(
-            artifact
+        artifact_id = get_artifact_id(artifact)
+
+        if artifact_id:
+            known.add(artifact_id.rstrip("_") + "_")
+
+        entries, up_to_date = process_artifact(
+            artifact,
+            index,
+            session,
+            catch_up,
+            executor
+        )
+
+        updates.extend(
+            (artifact, entry)
+            for entry in entries
+        )
+
+        if artifact_id and not up_to_date:
+            caught_up[artifact_language(artifact_id)] = False
+
+
+    for prefix in sorted(index):
+
+        if prefix in known or artifact_language(prefix) not in extra:
+            continue
+
+        print(
+            "\nNew artifact:",
+            prefix.rstrip("_")
+        )
+
+        artifact = create_artifact(
+            prefix
         )
 
+        latest = index[prefix][-1]
 
-    save_yaml(
-        data
+        entry = create_version_entry(
+            artifact,
+            {
+                "version": latest[0],
+                "url": latest[1],
+                "size": (
+                    latest[2]
+                    if latest[2] is not None
+                    else probe_size(latest[1], session)
+                )
+            }
+        )
+
+        entry["license"] = data.get("license")
+
+        updates.append(
+            (artifact, entry)
+        )
+
+
+    new_cache = dict(cache)
+
+    for language, (language_index, validators) in scans.items():
+
+        if (
+            language_index is not None
+            and caught_up[language]
+            and validators
+            and any(validators.values())
+        ):
+            new_cache[language] = validators
+
+
+    if new_cache:
+        data[LISTING_CACHE_KEY] = new_cache
+
+
+    return updates
+
+
+def get_proposals(
+    data,
+    session=requests,
+    catch_up=True,
+    executor=ThreadPoolExecutor
+):
+    """
+    Returns the updates as daily_check.py proposals.
+    """
+
+    known = [
+        id(artifact)
+        for artifact in data.get("artifacts", [])
+    ]
+
+    proposals = []
+
+    for artifact, entry in find_updates(
+        data,
+        session,
+        catch_up,
+        executor
+    ):
+
+        proposal = {
+            "artifact": get_artifact_id(artifact),
+            "entry": entry
+        }
+
+        if id(artifact) not in known:
+            proposal["new-artifact"] = {
+                key: value
+                for key, value in artifact.items()
+                if key != "versions"
+            }
+
+        proposals.append(
+            proposal
+        )
+
+    return proposals
+
+
+def check(metadata, context):
+    """
+    Plugin entry point for daily_check.py.
+    Returns all missing versions as one batch.
+    """
+
+    return get_proposals(
+        metadata,
+        context.session,
+        executor=context.executor
+    )
+
+
+def main():
+
+    # --next-only: add at most one release per artifact
+    catch_up = "--next-only" not in sys.argv[1:]
+
+    data = load_yaml()
+
+    cache = data.get(LISTING_CACHE_KEY)
+
+
+    proposals = get_proposals(
+        data,
+        catch_up=catch_up
     )
 
 
+    settings = {}
+
+    if data.get(LISTING_CACHE_KEY) != cache:
+        settings[LISTING_CACHE_KEY] = data[LISTING_CACHE_KEY]
+
+
+    if proposals or settings:
+        save_updates(
+            proposals,
+            settings
+        )
+
+
     print(
         "\nDone."
     )
@@ -1,15 +1,57 @@
 #!/usr/bin/env python3
+"""
+Checks that the GND files referenced in metadata.yaml are still online.
+
+DNB only keeps the latest dumps, so older files disappear over time.
+All distributions are probed concurrently; a version whose files are
+all gone (404/410) is deleted from Databus and marked `retired` in
+metadata.yaml, so it is not published again. Versions with only some
+files gone, and files that fail for other reasons (timeouts, 5xx), are
+only reported, and healthy versions stay published.
+"""
 import yaml
 import requests
 import sys
-import subprocess
 import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
 
 
 # Path to your YAML file
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 metadata_file = os.path.join(SCRIPT_DIR, "metadata.yaml")
 
+# Shared Databus helpers live in the repository's scripts/ folder
+sys.path.insert(0, os.path.join(SCRIPT_DIR, "..", "..", "scripts"))
+
+from kg_metadata import version_uri  # noqa: E402
+from remove_group import create_session, delete_resources, print_report  # noqa: E402
+
+# Concurrent HEAD requests
+PROBE_WORKERS = 16
+
+# Responses that mean the file was removed upstream
+GONE_STATUS = (404, 410)
+
+
+def probe(url, session):
+    """Return "ok", "gone" or "unreachable" for a file URL."""
+    try:
+        response = session.head(url, allow_redirects=True, timeout=10)
+    except requests.RequestException as e:
+        print(f"⚠️ Error accessing {url}: {e}")
+        return "unreachable"
+
+    if response.status_code == 200:
+        return "ok"
+
+    if response.status_code in GONE_STATUS:
+        print(f"🗑️ Gone: {url} (status: {response.status_code})")
+        return "gone"
+
+    print(f"⚠️ Unexpected status for {url}: {response.status_code}")
+    return "unreachable"
+
 
 def main():
 
@@ -26,69 +68,88 @@ def main():
     # Extract required metadata fields
     databus_account = data.get("databus-account")
     group_id = data.get("id")
-#    api_key = "bla bla"
-    api_key = os.environ.get(databus_account.upper().replace("-", "_"))
-    
+
     if not databus_account or not group_id:
         print("❌ Missing required fields (databus-account or id) in metadata.yaml")
         sys.exit(1)
 
+    # Versions that are still published, with their file URLs
+    versions = [
+        (artifact, version, [d.get("file") for d in version.get("distributions") or [] if d.get("file")])
+        for artifact in data.get("artifacts") or []
+        for version in artifact.get("versions") or []
+        if not version.get("retired")
+    ]
+    urls = sorted({url for _, _, files in versions for url in files})
+
+    if not urls:
+        if any(version.get("retired") for artifact in data.get("artifacts") or [] for version in artifact.get("versions") or []):
+            print("ℹ️ All GND versions in metadata.yaml are retired, nothing to check.")
+            return
+        print("❌ No file URLs found in metadata.yaml")
+        sys.exit(1)
+
+    # Check all files at once
+    print(f"🔍 Checking {len(urls)} GND file URLs...")
+    session = create_session(PROBE_WORKERS)
+    with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as pool:
+        results = dict(zip(urls, pool.map(lambda url: probe(url, session), urls)))
+
+    unreachable = [url for url, result in results.items() if result == "unreachable"]
+    gone = [
+        (artifact, version)
+        for artifact, version, files in versions
+        if files and all(results[url] == "gone" for url in files)
+    ]
+    partially_gone = [
+        (artifact, version, [url for url in files if results[url] == "gone"])
+        for artifact, version, files in versions
+        if any(results[url] == "gone" for url in files) and not all(results[url] == "gone" for url in files)
+    ]
+
+    if unreachable:
+        print(f"⚠️ {len(unreachable)} files could not be checked; their versions are kept.")
+
+    for artifact, version, files in partially_gone:
+        print(f"⚠️ {artifact['artifact']} {version['version']}: {len(files)} files are gone, the version is kept:")
+        for url in files:
+            print(f"  - {url}")
+
+    if not gone:
+        if not partially_gone and not unreachable:
+            print("✅ All GND releases in metadata.yaml are still available.")
+        return
+
+    print(f"🧹 Retiring {len(gone)} versions whose files are gone...")
+    api_key = os.environ.get(databus_account.upper().replace("-", "_"))
+
     if not api_key:
         print(f"⚠️ Warning: API key not provided via environment variable for account {databus_account}")
         sys.exit(1)
 
-    try:
-        artifacts = data.get("artifacts", [])
-        if not artifacts:
-            raise ValueError("No artifacts found in metadata.yaml")
-
-        first_artifact = artifacts[0]
-        versions = first_artifact.get("versions", [])
-        if not versions:
-            raise ValueError("No versions found in artifact")
-
-        first_version = versions[0]
-        distributions = first_version.get("distributions", [])
-        if not distributions:
-            raise ValueError("No distributions found in version")
-
-        file_url = distributions[0].get("file")
-        if not file_url:
-            raise ValueError("No file URL found in distribution")
-
-    except (KeyError, IndexError, ValueError) as e:
-        print(f"❌ Error extracting file URL: {e}")
-        sys.exit(1)
+    uris = [version_uri(data, artifact, version) for artifact, version in gone]
+    failed = delete_resources(uris, api_key, session=session)
 
-    # Show which URL will be checked
-    print(f"🔍 Checking file URL: {file_url}")
+    # Only versions removed from Databus are marked, the rest is retried next run
+    retired = 0
+    for (artifact, version), uri in zip(gone, uris):
+        if uri in failed:
+            continue
+        version["retired"] = date.today()
+        for distribution in version.get("distributions") or []:
+            distribution["status"] = "gone"
+        retired += 1
 
-    # Check if the file is reachable
-    try:
-        response = requests.head(file_url, allow_redirects=True, timeout=10)
-        if response.status_code == 200:
-            print("✅ The current GND release is valid.")
-            return
-        else:
-            print(f"⚠️ The current GND release is no longer available. (status: {response.status_code})")
-    except requests.RequestException as e:
-        print(f"⚠️ The current GND release is no longer available. (Error accessing file: {e})")
+    if retired:
+        with open(metadata_file, "w", encoding="utf-8") as f:
+            yaml.dump(data, f, sort_keys=False, allow_unicode=True)
+        print(f"💾 Marked {retired} versions as retired in {metadata_file}")
 
-    # Run remove_group.py if file unavailable
-    print("🧹 Running remove_group.py to remove group...")
-    try:
-        result = subprocess.run(
-            ["python3", "scripts/remove_group.py", databus_account, group_id, api_key],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        print("✅ remove_group.py executed successfully.")
-        print(result.stdout)
-    except subprocess.CalledProcessError as e:
-        print("❌ Error running remove-group.py:")
-        print(e.stderr)
+    print_report(failed)
+
+    if failed:
         sys.exit(1)
 
+
 if __name__ == "__main__":
     main()
@@ -1,23 +1,77 @@
+"""
+Incremental sync of the DNB open-data dumps into gnd/metadata.yaml.
+
+The listing is compared with the catalogued distributions by file name:
+only files that are not in metadata.yaml yet are probed, and they are
+added as new versions (or new artifacts). Catalogued distributions keep
+their status and sha256.
+"""
+import os
+import sys
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
 import yaml
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from urllib.parse import urljoin
 
-# --- Load existing metadata ---
-with open("metadata.yaml", "r") as f:
-    metadata = yaml.safe_load(f)
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+METADATA_FILE = os.path.join(SCRIPT_DIR, "metadata.yaml")
+
+# Shared helpers live in the repository's scripts/ folder
+sys.path.insert(0, os.path.join(SCRIPT_DIR, "..", "..", "scripts"))
+
+from autoindex import listing_url, parse_listing  # noqa: E402
+from kg_metadata import add_versions, append_versions, load_metadata, parse_version_date  # noqa: E402
+
+# lxml parses the listing much faster; fall back to the stdlib parser
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# Concurrent HEAD requests for sizes the listing does not give exactly
+PROBE_WORKERS = 16
+
+# Seconds per request
+TIMEOUT = 30
+
+# Dump file names: base name, optional release date, format
+DUMP_PATTERN = re.compile(r"(authorities-gnd.+?)(?:_(\d{8}))?\.(ttl|rdf|jsonld|hdt)\.gz")
+
+# --- Load existing metadata and index what is already catalogued ---
+metadata = load_metadata(METADATA_FILE)
+
+known_artifacts = {a["artifact"]: a for a in metadata.get("artifacts") or []}
+known_files = set()
+known_versions = {}
+for artifact_id, artifact in known_artifacts.items():
+    for version in artifact.get("versions") or []:
+        known_versions.setdefault((artifact_id, parse_version_date(version.get("version"))), version)
+        for distribution in version.get("distributions") or []:
+            known_files.add(str(distribution.get("file", "")).split("/")[-1])
+
+# --- One pooled session for the listing, checksums and size probes ---
+session = requests.Session()
+adapter = HTTPAdapter(pool_connections=PROBE_WORKERS, pool_maxsize=PROBE_WORKERS)
+session.mount("https://", adapter)
+session.mount("http://", adapter)
 
 # --- Fetch the DNB Open Data page ---
 base_url = "https://data.dnb.de/opendata/"
-resp = requests.get(base_url)
+resp = session.get(listing_url(base_url), timeout=TIMEOUT)
 resp.raise_for_status()
-soup = BeautifulSoup(resp.text, "html.parser")
+soup = BeautifulSoup(resp.text, HTML_PARSER)
+
+# --- Sizes and dates as shown in the listing ---
+listing = parse_listing(resp.text, base_url)
 
 # --- Fetch the checksum file ---
 checksum_url = urljoin(base_url, "001_Pruefsumme_Checksum.txt")
-resp_checksum = requests.get(checksum_url)
+resp_checksum = session.get(checksum_url, timeout=TIMEOUT)
 resp_checksum.raise_for_status()
 
 checksum_lines = resp_checksum.text.strip().splitlines()
@@ -28,90 +82,119 @@ for line in checksum_lines:
         sha256, fname = parts
         checksum_dict[fname] = sha256
 
-# --- Collect all .gz links with a date in filename ---
-links = []
+# --- Helper: size of a file from its headers, 0 if unknown ---
+def probe_size(url):
+    try:
+        head_resp = session.head(url, allow_redirects=True, timeout=TIMEOUT)
+        return int(head_resp.headers.get("Content-Length", 0))
+    except Exception:
+        return 0
+
+# --- Helper: text next to an anchor, up to the next tag ---
+def sibling_description(a):
+    description = ""
+    for sib in a.next_siblings:
+        if isinstance(sib, str):
+            description += sib.strip()
+        else:
+            break
+    description = re.sub(r'\s+', ' ', description)
+    description = re.split(r'\sFormat', description)[0].strip()[:-1]
+    return description + ". This version has been **auto-generated**."
+
+# --- Index every dump link in one pass over the page ---
+# filename -> {url, anchor, description, base, date, ext}; date is None
+# for the non-versioned file, whose description describes the artifact
+dumps = {}
+base_descriptions = {}
 for a in soup.find_all("a", href=True):
-    href = a["href"]
-    if href.endswith(".gz"):
-        filename = href.split("/")[-1]
-        if re.search(r"_\d{8}", filename):
-            full_url = urljoin(base_url, href)
-            links.append((full_url, a))  # store both URL and anchor tag
-
-# --- Helper: get description for non-versioned file ---
-def get_description_for_base(base_name):
-    for a in soup.find_all("a", href=True):
-        href = a["href"]
-        filename = href.split("/")[-1]
-        # Match non-versioned file
-        if re.match(rf"{re.escape(base_name)}\.(ttl|rdf|jsonld|hdt)\.gz", filename):
-            description = ""
-            for sib in a.next_siblings:
-                if isinstance(sib, str):
-                    description += sib.strip()
-                else:
-                    break
-            description = re.sub(r'\s+', ' ', description)
-            description = re.split(r'\sFormat', description)[0].strip()[:-1]
-            description += ". This version has been **auto-generated**."
-            return description
-    return "Description missing."
-
-# --- Group files into artifacts by base name (without date and extension) ---
-artifacts_dict = {}
-for link, a_tag in links:
-    filename = link.split("/")[-1]
-    match = re.match(r"(authorities-gnd.+?)_(\d{8})\.(ttl|rdf|jsonld|hdt)\.gz", filename)
-    if match:
-        base_name, version_date_str, ext = match.groups()
-        artifact_key = base_name
-        if artifact_key not in artifacts_dict:
-            description = get_description_for_base(base_name)  # <- updated here
-            artifacts_dict[artifact_key] = {
-                "artifact": base_name,
-                "title": base_name,
-                "description": description,
-                "versions": []
-            }
-
-        version_date = datetime.strptime(version_date_str, "%Y%m%d").date()
-        version_entry = next(
-            (v for v in artifacts_dict[artifact_key]["versions"] if v["version"] == version_date),
-            None
-        )
-        if not version_entry:
-            version_entry = {
-                "version": version_date,
-                "title": base_name,
-                "description": artifacts_dict[artifact_key]["description"],
-                "license": metadata.get("license"),
-                "distributions": []
-            }
-            artifacts_dict[artifact_key]["versions"].append(version_entry)
-
-        sha256_value = checksum_dict.get(filename, "missing")
-
-        # --- Fetch file size using HEAD request ---
-        try:
-            head_resp = requests.head(link, allow_redirects=True)
-            size_bytes = int(head_resp.headers.get("Content-Length", 0))
-        except Exception:
-            size_bytes = 0
-
-        version_entry["distributions"].append({
-            "file": link,  # full download URL
-            "format": ext,
-            "compression": "gz",
-            "size": size_bytes,
-            "sha256": sha256_value,
-            "status": "pending"
-        })
-
-# --- Convert artifacts dict to list ---
-metadata["artifacts"] = list(artifacts_dict.values())
-
-# --- Save updated metadata ---
-with open("metadata_with_artifacts.yaml", "w") as f:
-    yaml.dump(metadata, f, sort_keys=False, default_flow_style=False)
-
-print("✅ Metadata updated and saved to metadata_with_artifacts.yaml")
+    filename = a["href"].split("/")[-1]
+    match = DUMP_PATTERN.fullmatch(filename)
+    if not match or filename in dumps:
+        continue
+
+    base_name, date_str, ext = match.groups()
+    dumps[filename] = {
+        "url": urljoin(base_url, a["href"]),
+        "anchor": a,
+        "description": sibling_description(a),
+        "base": base_name,
+        "date": datetime.strptime(date_str, "%Y%m%d").date() if date_str else None,
+        "ext": ext,
+    }
+    if date_str is None:
+        base_descriptions.setdefault(base_name, dumps[filename]["description"])
+
+# --- Group unseen files into new versions by base name and date ---
+new_artifacts = {}
+new_versions = {}
+extended_versions = 0
+to_probe = []
+for filename, dump in dumps.items():
+    if dump["date"] is None or filename in known_files:
+        continue
+
+    base_name, version_date, ext, link = dump["base"], dump["date"], dump["ext"], dump["url"]
+    if base_name not in known_artifacts and base_name not in new_artifacts:
+        new_artifacts[base_name] = {
+            "artifact": base_name,
+            "title": base_name,
+            "description": base_descriptions.get(base_name, "Description missing."),
+        }
+    description = (known_artifacts.get(base_name) or new_artifacts[base_name]).get("description")
+
+    version_entry = known_versions.get((base_name, version_date)) or new_versions.get((base_name, version_date))
+    if not version_entry:
+        version_entry = {
+            "version": version_date,
+            "title": base_name,
+            "description": description,
+            "license": metadata.get("license"),
+            "distributions": []
+        }
+        new_versions[(base_name, version_date)] = version_entry
+    elif (base_name, version_date) in known_versions:
+        # a new format of a catalogued version
+        extended_versions += 1
+
+    sha256_value = checksum_dict.get(filename, "missing")
+
+    # --- File size from the listing; approximate ones are probed below ---
+    listed = listing.get(filename)
+    distribution = {
+        "file": link,  # full download URL
+        "format": ext,
+        "compression": "gz",
+        "size": listed["size"] if listed and listed["exact"] else None,
+        "sha256": sha256_value,
+        "status": "pending"
+    }
+    version_entry.setdefault("distributions", []).append(distribution)
+    if distribution["size"] is None:
+        to_probe.append(distribution)
+
+# --- Probe the remaining sizes concurrently ---
+print(f"Probing {len(to_probe)} file sizes...")
+with ThreadPoolExecutor(max_workers=PROBE_WORKERS) as pool:
+    for distribution, size_bytes in zip(to_probe, pool.map(probe_size, [d["file"] for d in to_probe])):
+        distribution["size"] = size_bytes
+
+# --- Merge into metadata.yaml ---
+proposals = []
+for (base_name, _), version_entry in sorted(new_versions.items(), key=lambda item: item[0]):
+    proposal = {"artifact": base_name, "entry": version_entry}
+    if base_name in new_artifacts:
+        proposal["new-artifact"] = new_artifacts[base_name]
+    proposals.append(proposal)
+
+if not proposals and not extended_versions:
+    print("✅ gnd/metadata.yaml is up to date with the DNB listing")
+elif extended_versions:
+    # new distributions inside existing versions: write the whole document
+    add_versions(metadata, proposals)
+    with open(METADATA_FILE, "w") as f:
+        yaml.dump(metadata, f, sort_keys=False, default_flow_style=False, allow_unicode=True)
+    print(f"✅ Added {len(proposals)} versions and {extended_versions} distributions to {METADATA_FILE}")
+else:
+    append_versions(METADATA_FILE, proposals)
+    print(f"✅ Added {len(proposals)} versions to {METADATA_FILE}")
@@ -0,0 +1,102 @@
+"""
+Parser for Apache-style autoindex (directory listing) pages.
+
+Release pages such as kaiko.getalp.org and data.dnb.de list every file
+with its modification time and size, e.g.
+
+    <a href="dump_20250926.ttl.gz">dump_20250926.ttl.gz</a>  2025-09-26 14:49   42M  Description
+
+so sizes and dates can be read from the one listing request instead of
+one HEAD per file. Human-readable sizes ("42M") are only approximate;
+entries carry `exact: False` and callers should HEAD those files when
+they need the byte count.
+"""
+
+import re
+from datetime import datetime
+from html import unescape
+from urllib.parse import unquote, urljoin
+
+# Query asking Apache for the "fancy" listing with date and size columns
+FANCY_INDEX_QUERY = "?F=1"
+
+ANCHOR = re.compile(r'<a\s+[^>]*href="([^"?#]+)"[^>]*>.*?</a>', re.I | re.S)
+TAG = re.compile(r"<[^>]+>")
+
+# 2025-09-29 14:49, 29-Sep-2025 14:49 (older Apache default)
+TIMESTAMP = re.compile(r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}(?::\d{2})?|\d{2}-[A-Z][a-z]{2}-\d{4} \d{2}:\d{2})")
+SIZE = re.compile(r"^\s*(\d+(?:\.\d+)?)([KMGT]?)(?:\s|$)")
+
+TIMESTAMP_FORMATS = ("%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S", "%d-%b-%Y %H:%M")
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def listing_url(url):
+    """URL of the fancy index for a directory URL."""
+    return url + FANCY_INDEX_QUERY
+
+
+def parse_timestamp(text):
+    for fmt in TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_listing(html, base_url):
+    """
+    Parse a listing page in one pass.
+
+    Returns an ordered dict: filename -> {url, modified, size, exact, text},
+    where `text` is the remaining column text after the size (e.g. a
+    description) and `size`/`modified` are None if the row lacks them.
+    """
+    entries = {}
+    anchors = list(ANCHOR.finditer(html))
+    preformatted = "<pre" in html.lower()
+
+    for i, match in enumerate(anchors):
+        href = unescape(match.group(1))
+        filename = unquote(href.rstrip("/").split("/")[-1])
+
+        # skip the parent directory and absolute navigation links
+        if not filename or href.startswith(("..", "/")):
+            continue
+
+        end = anchors[i + 1].start() if i + 1 < len(anchors) else len(html)
+        row = html[match.end():end]
+        # a row ends with its table row, or its line in <pre> listings
+        if "</tr>" in row.lower():
+            row = row[:row.lower().index("</tr>")]
+        elif preformatted:
+            row = row.split("\n", 1)[0]
+        row = unescape(TAG.sub(" ", row))
+
+        modified = None
+        size = None
+        exact = False
+        text = row
+
+        ts = TIMESTAMP.search(row)
+        if ts:
+            modified = parse_timestamp(ts.group(1))
+            text = row[ts.end():]
+
+            sz = SIZE.match(text)
+            if sz:
+                number, unit = sz.groups()
+                size = int(float(number) * SIZE_UNITS[unit])
+                exact = unit == "" and "." not in number
+                text = text[sz.end():]
+
+        entries.setdefault(filename, {
+            "url": urljoin(base_url, href),
+            "modified": modified,
+            "size": size,
+            "exact": exact,
+            "text": " ".join(text.split()),
+        })
+
+    return entries
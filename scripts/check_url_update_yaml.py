@@ -22,6 +22,10 @@ publish_triggered = False  # Track if Databus publish should be set
 # --- Step 2: Traverse artifacts -> versions -> distributions ---
 for artifact in data.get("artifacts", []):
     for version in artifact.get("versions", []):
+        # Retired versions are gone upstream and no longer published
+        if version.get("retired"):
+            continue
+
         for dist in version.get("distributions", []):
             url = dist.get("file")
             if not url:
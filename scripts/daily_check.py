@@ -1,22 +1,157 @@
 #!/usr/bin/env python3
+"""
+Runs the `check-new-release` checker of every KG.
+
+A checker is either a plain script, run as a subprocess, or a plugin:
+a module that defines
+
+    def check(metadata, context):
+        return [{"artifact": "<artifact id>", "entry": {<version entry>}}, ...]
+
+A proposal for an artifact that is not in metadata.yaml yet may carry
+"new-artifact": {<artifact fields without versions>} to create it.
+
+KGs without a script but with a `release-source` block are handled by
+the generic release_discovery.py plugin.
+
+Plugins are imported in-process and share one HTTP session
+(`context.session`). The proposed version entries are appended to the
+KG's metadata.yaml by daily_check.py (in place, see
+kg_metadata.append_versions), so plugins never write the file
+themselves. Plugins may also update top-level metadata keys (e.g. a
+listing cache); daily_check.py saves those changes as well. Plugin
+modules must keep their script behaviour under
+`if __name__ == "__main__":`.
+
+Plugins that run work in their own thread pool should create it with
+`context.executor` (a ThreadPoolExecutor), so the output of its workers
+also lands in the KG's output block.
+
+Checks follow each KG's observed release cadence: the next release is
+expected one median interval (of the recent version dates) after the
+latest version, and a KG is only checked from shortly before that date
+on, plus once a week as a catch-all. KGs with too little history, or
+with `check-schedule: daily`, are checked every day; `--all` checks
+every KG regardless of its schedule.
+"""
+import ast
+import contextvars
+import importlib.util
+import io
 import os
 import subprocess
+import sys
+import threading
+import time
+import types
 import yaml
-from datetime import datetime
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from kg_metadata import add_versions, append_versions, load_metadata, release_dates
 
 # Path to the folder containing all KG folders
 KGS_ROOT = os.path.join(os.path.dirname(__file__), "..", "knowledge-graphs")
 
+# Checker for KGs that declare a `release-source` instead of a script
+RELEASE_DISCOVERY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "release_discovery.py")
+
+# Number of release checkers running at the same time
+MAX_WORKERS = 4
+
+# Wall-clock limit per checker in seconds; a KG can override it with
+# `check-new-release-timeout` in its metadata.yaml
+DEFAULT_TIMEOUT = 600
+
+# Adaptive schedule: number of recent release intervals to learn from,
+# the check window before the expected release (fraction of the interval,
+# at least MIN_WINDOW_DAYS) and the catch-all probe period
+RECENT_INTERVALS = 6
+WINDOW_FRACTION = 0.2
+MIN_WINDOW_DAYS = 2
+CATCH_ALL_DAYS = 7
+
 def log(msg):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    print(f"[{timestamp}] {msg}")
+    print(f"[{timestamp}] {msg}", flush=True)
 
-def run_daily_check():
-    if not os.path.isdir(KGS_ROOT):
-        log(f"Knowledge graphs root folder not found: {KGS_ROOT}")
-        return
+class ThreadOutput(io.TextIOBase):
+    """
+    sys.stdout replacement that lets plugins capture their own output.
+
+    The buffer is held in a context variable, so threads that run in a
+    copy of a plugin's context write to that plugin's buffer too.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.current = contextvars.ContextVar("output_buffer", default=None)
+
+    def capture(self, buffer):
+        self.current.set(buffer)
+
+    def write(self, text):
+        return (self.current.get() or self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+class ContextExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor whose tasks run in a copy of the submitter's context (and output capture)."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+def create_session():
+    """One pooled HTTP session shared by all plugin checkers."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=MAX_WORKERS * 2, pool_maxsize=MAX_WORKERS * 4)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def estimate_next_release(metadata):
+    """Return (expected date, interval in days), or None without enough history."""
+    dates = release_dates(metadata)
+    if len(dates) < 3:
+        return None
+
+    intervals = [(b - a).days for a, b in zip(dates, dates[1:])][-RECENT_INTERVALS:]
+    interval = sorted(intervals)[len(intervals) // 2]
+
+    return dates[-1] + timedelta(days=interval), interval
+
+def check_due(kg_name, metadata, today):
+    """Return (due, reason) for a KG's release check today."""
+    if metadata.get("check-schedule", "adaptive") == "daily":
+        return True, "daily schedule"
+
+    estimate = estimate_next_release(metadata)
+    if estimate is None:
+        return True, "not enough release history"
+
+    expected, interval = estimate
+    window = max(MIN_WINDOW_DAYS, round(interval * WINDOW_FRACTION))
+
+    if today >= expected - timedelta(days=window):
+        return True, f"release expected {expected}"
+
+    # spread the catch-all probes of different KGs over the week
+    if today.toordinal() % CATCH_ALL_DAYS == zlib.crc32(kg_name.encode()) % CATCH_ALL_DAYS:
+        return True, f"weekly catch-all, release expected {expected}"
+
+    return False, f"release expected {expected}"
+
+def collect_checkers(check_all=False, today=None):
+    """Return (kg_name, script_path, timeout, metadata_file) for every KG due for a check."""
+    today = today or date.today()
+    checkers = []
 
-    for kg_name in os.listdir(KGS_ROOT):
+    for kg_name in sorted(os.listdir(KGS_ROOT)):
         kg_path = os.path.join(KGS_ROOT, kg_name)
         if not os.path.isdir(kg_path):
             continue
@@ -34,21 +169,176 @@ def run_daily_check():
             continue
 
         script_name = metadata.get("check-new-release")
-        if not script_name:
-            log(f"No 'check-new-release' script for {kg_name}, skipping.")
+        if script_name:
+            script_path = os.path.join(kg_path, script_name)
+        elif metadata.get("release-source"):
+            script_path = RELEASE_DISCOVERY
+        else:
+            log(f"No 'check-new-release' script or 'release-source' for {kg_name}, skipping.")
             continue
 
-        script_path = os.path.join(kg_path, script_name)
         if not os.path.isfile(script_path):
             log(f"Referenced script not found: {script_path}, skipping.")
             continue
 
-        log(f"Running {script_name} for {kg_name}...")
+        due, reason = check_due(kg_name, metadata, today)
+        if not due and not check_all:
+            log(f"Skipping {kg_name}: {reason}.")
+            continue
+        log(f"Checking {kg_name}: {reason}.")
+
+        timeout = metadata.get("check-new-release-timeout", DEFAULT_TIMEOUT)
+        checkers.append((kg_name, script_path, timeout, metadata_file))
+
+    return checkers
+
+def is_plugin(script_path):
+    """True if the script defines a top-level check() function."""
+    with open(script_path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=script_path)
+    return any(
+        isinstance(node, ast.FunctionDef) and node.name == "check"
+        for node in tree.body
+    )
+
+def load_plugin(kg_name, script_path):
+    """Import a plugin checker module; plain scripts are never imported."""
+    if not is_plugin(script_path):
+        return None
+
+    spec = importlib.util.spec_from_file_location(f"checker_{kg_name.replace('-', '_')}", script_path)
+    module = importlib.util.module_from_spec(spec)
+    # checkers import their siblings (e.g. shared helpers) by plain name
+    sys.path.insert(0, os.path.dirname(script_path))
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        sys.path.remove(os.path.dirname(script_path))
+    return module
+
+def run_plugin(kg_name, plugin, timeout, metadata_file, session):
+    """Run a plugin in-process with a timeout. Returns (outcome, output)."""
+    metadata = load_metadata(metadata_file)
+
+    context = types.SimpleNamespace(
+        kg_name=kg_name,
+        kg_path=os.path.dirname(metadata_file),
+        metadata_file=metadata_file,
+        session=session,
+        executor=ContextExecutor,
+        log=log,
+    )
+
+    settings_before = {k: yaml.safe_dump(v) for k, v in metadata.items() if k != "artifacts"}
+
+    buffer = io.StringIO()
+    result = {}
+
+    def target():
+        sys.stdout.capture(buffer)
         try:
-            subprocess.run(["python3", script_path], check=True)
-            log(f"Finished {script_name} for {kg_name}.")
-        except subprocess.CalledProcessError as e:
-            log(f"Error running {script_path}: {e}")
+            result["proposals"] = plugin.check(metadata, context) or []
+        except Exception as e:
+            result["error"] = e
+
+    worker = threading.Thread(target=target, daemon=True)
+    worker.start()
+    worker.join(timeout)
+
+    if worker.is_alive():
+        # the thread cannot be killed; its late result is simply ignored
+        return f"timeout ({timeout}s)", buffer.getvalue()
+
+    if "error" in result:
+        return f"failed ({result['error']!r})", buffer.getvalue()
+
+    # only the new versions and changed settings are written back
+    settings = {
+        k: v for k, v in metadata.items()
+        if k != "artifacts" and settings_before.get(k) != yaml.safe_dump(v)
+    }
+    added = add_versions(metadata, result["proposals"])
+
+    if added or settings:
+        append_versions(metadata_file, added, settings)
+
+    return f"ok (+{len(added)} versions)", buffer.getvalue()
+
+def run_script(script_path, timeout):
+    """Run a plain checker script as a subprocess. Returns (outcome, output)."""
+    try:
+        result = subprocess.run(
+            [sys.executable, script_path],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            timeout=timeout,
+        )
+        outcome = "ok" if result.returncode == 0 else f"failed ({result.returncode})"
+        output = result.stdout
+    except subprocess.TimeoutExpired as e:
+        outcome = f"timeout ({timeout}s)"
+        output = e.stdout or ""
+        if isinstance(output, bytes):
+            output = output.decode("utf-8", errors="replace")
+
+    return outcome, output
+
+def run_checker(kg_name, script_path, timeout, metadata_file, session):
+    """Run one checker. Returns (outcome, duration, output)."""
+    start = time.monotonic()
+
+    try:
+        plugin = load_plugin(kg_name, script_path)
+    except Exception as e:
+        log(f"Could not import {script_path} ({e!r}), running it as a script.")
+        plugin = None
+
+    if plugin:
+        log(f"Running plugin {os.path.basename(script_path)} for {kg_name}...")
+        outcome, output = run_plugin(kg_name, plugin, timeout, metadata_file, session)
+    else:
+        log(f"Running {os.path.basename(script_path)} for {kg_name}...")
+        outcome, output = run_script(script_path, timeout)
+
+    duration = time.monotonic() - start
+    log(f"Finished {kg_name}: {outcome} in {duration:.1f}s")
+
+    return outcome, duration, output
+
+def print_summary(results):
+    print("\n" + "=" * 60)
+    print(f"{'KG':<25} {'DURATION':>10}  OUTCOME")
+    print("-" * 60)
+    for kg_name, (outcome, duration, _) in results.items():
+        print(f"{kg_name:<25} {duration:>9.1f}s  {outcome}")
+    print("=" * 60)
+
+def run_daily_check(check_all=False):
+    if not os.path.isdir(KGS_ROOT):
+        log(f"Knowledge graphs root folder not found: {KGS_ROOT}")
+        return
+
+    checkers = collect_checkers(check_all)
+    session = create_session()
+    sys.stdout = ThreadOutput(sys.stdout)
+
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            futures = {
+                kg_name: pool.submit(run_checker, kg_name, script_path, timeout, metadata_file, session)
+                for kg_name, script_path, timeout, metadata_file in checkers
+            }
+            results = {kg_name: future.result() for kg_name, future in futures.items()}
+    finally:
+        sys.stdout = sys.stdout.stream
+
+    # Print each checker's output as one block so parallel runs don't interleave
+    for kg_name, (outcome, _, output) in results.items():
+        print(f"\n----- {kg_name} ({outcome}) -----")
+        print(output.rstrip() or "(no output)")
+
+    print_summary(results)
 
 if __name__ == "__main__":
-    run_daily_check()
+    run_daily_check(check_all="--all" in sys.argv[1:])
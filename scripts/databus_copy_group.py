@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 
 import argparse
+import hashlib
 import json
 import os
 import sys
+from urllib.parse import urlparse
+
 import requests
 
 
@@ -12,12 +15,18 @@ import requests
 # =========================================================
 SOURCE_GROUP = "https://databus.dev.dbpedia.link/fhofer/dbpedia-wikipedia-kg-dump"
 
-SPARQL_ENDPOINT = "https://databus.dev.dbpedia.link/sparql"
+# None: use the /sparql endpoint on each source group's host
+SPARQL_ENDPOINT = None
+
+SPARQL_PAGE_SIZE = 1000
 
 PUBLISH_URL = "https://databus.dbpedia.org/api/publish?fetch-file-properties=false"
 
 TARGET_BASE = "https://databus.dbpedia.org/knowledge-graph-catalog"
 
+# Seconds to wait for a JSON-LD document
+TIMEOUT = 60
+
 
 # =========================================================
 # DEBUG
@@ -89,7 +98,7 @@ def fetch_jsonld(url):
 
     debug("GET", {"url": url, "headers": headers})
 
-    r = requests.get(url, headers=headers)
+    r = requests.get(url, headers=headers, timeout=TIMEOUT)
 
     print("→ STATUS:", r.status_code)
 
@@ -100,6 +109,20 @@ def fetch_jsonld(url):
     return r.json()
 
 
+# Source documents are fetched once per run and shared by every graph
+# and target group they are copied into.
+SOURCE_CACHE = {}
+
+
+def fetch_source(url):
+    if url not in SOURCE_CACHE:
+        SOURCE_CACHE[url] = fetch_jsonld(url)
+    else:
+        print("→ CACHED:", url)
+
+    return SOURCE_CACHE[url]
+
+
 def publish(payload, api_key):
     headers = {
         "accept": "application/json",
@@ -119,16 +142,189 @@ def publish(payload, api_key):
 
     if r.status_code >= 400:
         print("❌ RESPONSE:", r.text)
-        sys.exit(1)
 
+    r.raise_for_status()
+    return r.json()
+
+
+# =========================================================
+# COMPARE BEFORE PUBLISH
+# =========================================================
+def fetch_target(target_id):
+    r = requests.get(
+        target_id,
+        headers={"accept": "application/ld+json"},
+        timeout=TIMEOUT
+    )
+
+    if r.status_code == 404:
+        return None
+
+    r.raise_for_status()
     return r.json()
 
 
+def normalize(value):
+    if isinstance(value, dict):
+        if "@value" in value:
+            return normalize(value["@value"])
+        if "@id" in value:
+            return value["@id"]
+
+    if isinstance(value, list):
+        if len(value) == 1:
+            return normalize(value[0])
+        return sorted(str(normalize(v)) for v in value)
+
+    if value is None:
+        return ""
+
+    return str(value)
+
+
+def node_value(node, key):
+    # the target may return compacted ("byteSize") or prefixed
+    # ("dcat:byteSize") keys, depending on the context used
+    if key in node:
+        return normalize(node[key])
+
+    short = key.split(":", 1)[-1]
+
+    for k, v in node.items():
+        if k.split(":", 1)[-1] == short:
+            return normalize(v)
+
+    return ""
+
+
+def same_fields(expected, node):
+    for key, value in expected.items():
+        if key in ("@type", "distribution"):
+            continue
+
+        if normalize(value) != node_value(node, key):
+            return False
+
+    return True
+
+
+def target_matches(payload):
+    entity = payload["@graph"]
+
+    try:
+        data = fetch_target(entity["@id"])
+    except Exception as e:
+        print("⚠️  Could not fetch target, publishing anyway:", e)
+        return False
+
+    if data is None:
+        return False
+
+    node = find_first(data, entity["@type"])
+
+    if not node or not same_fields(entity, node):
+        return False
+
+    if "distribution" not in entity:
+        return True
+
+    parts = {p.get("@id"): p for p in find_all(data, "Part")}
+
+    if len(parts) != len(entity["distribution"]):
+        return False
+
+    for dist in entity["distribution"]:
+        part = parts.get(dist["@id"])
+
+        if not part or not same_fields(dist, part):
+            return False
+
+    return True
+
+
+# =========================================================
+# JOURNAL (CHECKPOINT / RESUME)
+# =========================================================
+def payload_hash(payload):
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def load_journal(path, force=False):
+    done = {}
+
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+
+                if not line:
+                    continue
+
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # a half-written last line from an interrupted run
+                    continue
+
+                done[entry["id"]] = entry["sha256"]
+
+    print(f"JOURNAL {path}: {len(done)} entries already published")
+
+    return {
+        "path": path,
+        "done": done,
+        "force": force,
+        "copied": 0,
+        "skipped": 0,
+        "unchanged": 0,
+        "failed": 0
+    }
+
+
+def record_journal(journal, target_id, digest):
+    with open(journal["path"], "a", encoding="utf-8") as f:
+        f.write(json.dumps({"id": target_id, "sha256": digest}) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+    journal["done"][target_id] = digest
+
+
+def publish_entry(payload, api_key, journal):
+    target_id = payload["@graph"]["@id"]
+    digest = payload_hash(payload)
+
+    if not journal["force"] and journal["done"].get(target_id) == digest:
+        print("⏭️  SKIP (journal):", target_id)
+        journal["skipped"] += 1
+        return
+
+    if not journal["force"] and target_matches(payload):
+        print("⏭️  SKIP (unchanged on target):", target_id)
+        record_journal(journal, target_id, digest)
+        journal["unchanged"] += 1
+        return
+
+    publish(payload, api_key)
+
+    record_journal(journal, target_id, digest)
+    journal["copied"] += 1
+
+
+def print_summary(journal):
+    print("\n################ SUMMARY ################")
+    print(f"COPIED   : {journal['copied']}")
+    print(f"SKIPPED  : {journal['skipped']}")
+    print(f"UNCHANGED: {journal['unchanged']}")
+    print(f"FAILED   : {journal['failed']}")
+
+
 # =========================================================
 # GROUP
 # =========================================================
-def fetch_group():
-    data = fetch_jsonld(SOURCE_GROUP)
+def fetch_group(source_group):
+    data = fetch_source(source_group)
 
     g = find_first(data, "Group")
 
@@ -141,7 +337,7 @@ def fetch_group():
     )
 
 
-def publish_group(group_id, title, description, abstract, api_key):
+def publish_group(group_id, title, description, abstract, api_key, journal):
     group_id = group_id.strip("/")
 
     payload = {
@@ -156,27 +352,26 @@ def publish_group(group_id, title, description, abstract, api_key):
     }
 
     print("\n===== PUBLISH GROUP =====")
-    publish(payload, api_key)
+    publish_entry(payload, api_key, journal)
 
 
 # =========================================================
-# ARTIFACTS
+# COPY PLAN
 # =========================================================
-def query_artifacts():
-    query = f"""
-PREFIX databus: <https://dataid.dbpedia.org/databus#>
 
-SELECT DISTINCT ?artifact
-WHERE {{
-  ?version databus:group <{SOURCE_GROUP}> .
-  ?version databus:artifact ?artifact .
-}}
-"""
+def sparql_endpoint(source_group):
+    if SPARQL_ENDPOINT:
+        return SPARQL_ENDPOINT
+
+    u = urlparse(source_group)
+    return f"{u.scheme}://{u.netloc}/sparql"
 
-    debug("SPARQL ARTIFACTS", {"query": query})
+
+def sparql_select(endpoint, query):
+    debug("SPARQL", {"endpoint": endpoint, "query": query})
 
     r = requests.post(
-        SPARQL_ENDPOINT,
+        endpoint,
         data={"query": query},
         headers={"accept": "application/sparql-results+json"}
     )
@@ -187,16 +382,128 @@ WHERE {{
         print("❌ RESPONSE:", r.text)
         r.raise_for_status()
 
-    data = r.json()
+    return r.json()["results"]["bindings"]
+
+
+def query_copy_plan(source_group, graphs):
+    # One paginated query for every (artifact, version, graph) triple of
+    # the group, for all requested graphs at once. Every artifact of the
+    # group is returned, even without a version in any of the graphs,
+    # so it is still copied: the artifact rows and the version rows come
+    # from the two branches of a UNION, never from a join of both.
+    artifacts = []
+    versions = {graph: {} for graph in graphs}
+    offset = 0
+
+    values = " ".join(json.dumps(g) for g in graphs)
+
+    while True:
+        query = f"""
+PREFIX databus: <https://dataid.dbpedia.org/databus#>
+PREFIX databus-cv: <https://dataid.dbpedia.org/databus-cv#>
+PREFIX dcat: <http://www.w3.org/ns/dcat#>
+
+SELECT DISTINCT ?artifact ?version ?graph
+WHERE {{
+  {{
+    ?any databus:group <{source_group}> .
+    ?any databus:artifact ?artifact .
+  }}
+  UNION
+  {{
+    VALUES ?graph {{ {values} }}
+    ?version databus:group <{source_group}> .
+    ?version databus:artifact ?artifact .
+    ?version dcat:distribution ?distribution .
+    ?distribution databus-cv:graph ?graph .
+  }}
+}}
+ORDER BY ?artifact ?version ?graph
+LIMIT {SPARQL_PAGE_SIZE}
+OFFSET {offset}
+"""
+
+        bindings = sparql_select(sparql_endpoint(source_group), query)
+
+        for b in bindings:
+            artifact = b["artifact"]["value"]
+
+            if artifact not in artifacts:
+                artifacts.append(artifact)
+
+            if "version" in b:
+                versions[b["graph"]["value"]].setdefault(
+                    artifact, []
+                ).append(b["version"]["value"])
+
+        if len(bindings) < SPARQL_PAGE_SIZE:
+            return artifacts, versions
+
+        offset += SPARQL_PAGE_SIZE
+
+
+def build_copy_plan(jobs):
+    # jobs: (source_group, graph, target_group_id, target_title) tuples.
+    # Returns one entry per target group with the union of artifacts and
+    # versions it receives, querying each source group only once. The
+    # group description comes from the first source; artifacts of several
+    # sources that would land on the same target artifact are rejected.
+    graphs_by_source = {}
+
+    for source_group, graph, _, _ in jobs:
+        graphs = graphs_by_source.setdefault(source_group, [])
+        if graph not in graphs:
+            graphs.append(graph)
+
+    source_plans = {
+        source_group: query_copy_plan(source_group, graphs)
+        for source_group, graphs in graphs_by_source.items()
+    }
+
+    targets = {}
+
+    for source_group, graph, group_id, title in jobs:
+        artifacts, versions = source_plans[source_group]
+
+        target = targets.setdefault(group_id.strip("/"), {
+            "title": title,
+            "source": source_group,
+            "artifacts": {}
+        })
+
+        for artifact in artifacts:
+            planned = target["artifacts"].setdefault(artifact, [])
+
+            for v in versions[graph].get(artifact, []):
+                if v not in planned:
+                    planned.append(v)
+
+    for group_id, target in targets.items():
+        by_id = {}
+
+        for artifact in target["artifacts"]:
+            artifact_id = artifact.rstrip("/").split("/")[-1]
+            by_id.setdefault(artifact_id, []).append(artifact)
+
+        collisions = {a: uris for a, uris in by_id.items() if len(uris) > 1}
+
+        if collisions:
+            raise ValueError(
+                f"target group {group_id} would receive the same artifact "
+                "from several sources: " + "; ".join(
+                    f"{a} ({', '.join(uris)})"
+                    for a, uris in collisions.items()
+                )
+            )
 
-    return [
-        b["artifact"]["value"]
-        for b in data["results"]["bindings"]
-    ]
+    return targets
 
 
-def publish_artifact(group_id, artifact_uri, api_key):
-    data = fetch_jsonld(artifact_uri)
+# =========================================================
+# ARTIFACTS
+# =========================================================
+def publish_artifact(group_id, artifact_uri, api_key, journal):
+    data = fetch_source(artifact_uri)
 
     a = find_first(data, "Artifact")
 
@@ -219,55 +526,15 @@ def publish_artifact(group_id, artifact_uri, api_key):
     }
 
     print("\n===== PUBLISH ARTIFACT =====", target_id)
-    publish(payload, api_key)
-
-
-# =========================================================
-# VERSIONS
-# =========================================================
-def query_versions(artifact_uri, graph):
-    query = f"""
-PREFIX databus: <https://dataid.dbpedia.org/databus#>
-PREFIX databus-cv: <https://dataid.dbpedia.org/databus-cv#>
-PREFIX dcat: <http://www.w3.org/ns/dcat#>
-
-SELECT DISTINCT ?version
-WHERE {{
-  ?version databus:group <{SOURCE_GROUP}> .
-  ?version databus:artifact <{artifact_uri}> .
-  ?version dcat:distribution ?distribution .
-  ?distribution databus-cv:graph "{graph}" .
-}}
-"""
-
-    debug("SPARQL VERSIONS", {"query": query})
-
-    r = requests.post(
-        SPARQL_ENDPOINT,
-        data={"query": query},
-        headers={"accept": "application/sparql-results+json"}
-    )
-
-    print("→ STATUS:", r.status_code)
-
-    if r.status_code >= 400:
-        print("❌ RESPONSE:", r.text)
-        r.raise_for_status()
-
-    data = r.json()
-
-    return [
-        b["version"]["value"]
-        for b in data["results"]["bindings"]
-    ]
+    publish_entry(payload, api_key, journal)
 
 
 # =========================================================
 # VERSION + PARTS
 # =========================================================
-def publish_version(group_id, artifact_id, version_uri, api_key):
+def publish_version(group_id, artifact_id, version_uri, api_key, journal):
 
-    data = fetch_jsonld(version_uri)
+    data = fetch_source(version_uri)
 
     v = find_first(data, "Version")
     parts = find_all(data, "Part")
@@ -335,67 +602,180 @@ def publish_version(group_id, artifact_id, version_uri, api_key):
     }
 
     print("\n===== PUBLISH VERSION =====", version_id)
-    publish(payload, api_key)
+    publish_entry(payload, api_key, journal)
 
 
 # =========================================================
 # MAIN
 # =========================================================
 def main():
-    parser = argparse.ArgumentParser()
+    global SPARQL_ENDPOINT, PUBLISH_URL, TARGET_BASE
+
+    parser = argparse.ArgumentParser(
+        description=(
+            "Copy Databus groups, filtered by databus-cv:graph, into "
+            "target groups. Every --source-group x --graph combination "
+            "is copied into the positional target group; --job adds "
+            "explicit source/graph/target mappings."
+        )
+    )
 
-    parser.add_argument("group_id")
-    parser.add_argument("group_title")
+    parser.add_argument("group_id", nargs="?")
+    parser.add_argument("group_title", nargs="?")
     parser.add_argument("--api-key", required=False)
-    parser.add_argument("--graph", required=True)
-    
+    parser.add_argument("--graph", action="append", default=[])
+    parser.add_argument(
+        "--source-group",
+        action="append",
+        default=[],
+        help=f"source group URI (default: {SOURCE_GROUP})"
+    )
+    parser.add_argument(
+        "--job",
+        nargs=4,
+        action="append",
+        default=[],
+        metavar=("SOURCE_GROUP", "GRAPH", "GROUP_ID", "GROUP_TITLE")
+    )
+    parser.add_argument(
+        "--sparql-endpoint",
+        help="source SPARQL endpoint (default: <source host>/sparql)"
+    )
+    parser.add_argument("--target-base", default=TARGET_BASE)
+    parser.add_argument(
+        "--publish-url",
+        help="publish API (default: <target host>/api/publish)"
+    )
+    parser.add_argument(
+        "--journal",
+        help="checkpoint file (default: copy-journal-<group_id>.jsonl)"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help=(
+            "publish every entry, even if it is in the journal or the "
+            "target already has identical metadata"
+        )
+    )
+
     args = parser.parse_args()
 
+    jobs = [tuple(job) for job in args.job]
+
+    if args.group_id:
+        if not args.group_title or not args.graph:
+            parser.error("group_id requires group_title and --graph")
+
+        for source_group in args.source_group or [SOURCE_GROUP]:
+            for graph in args.graph:
+                jobs.append(
+                    (source_group, graph, args.group_id, args.group_title)
+                )
+
+    if not jobs:
+        parser.error("nothing to copy: give group_id/--graph or --job")
+
+    SPARQL_ENDPOINT = args.sparql_endpoint
+    TARGET_BASE = args.target_base.rstrip("/")
+
+    if args.publish_url:
+        PUBLISH_URL = args.publish_url
+    else:
+        u = urlparse(TARGET_BASE)
+        PUBLISH_URL = (
+            f"{u.scheme}://{u.netloc}/api/publish?fetch-file-properties=false"
+        )
+
     api_key = args.api_key or os.getenv("DATABUS_API_KEY")
 
     if not api_key:
         print("Missing API key")
         sys.exit(1)
 
-    # ---------------- GROUP ----------------
-    print("\n################ GROUP ################")
+    journal_name = "-".join(
+        sorted({group_id.strip("/") for _, _, group_id, _ in jobs})
+    )
 
-    desc, abs_ = fetch_group()
+    journal = load_journal(
+        args.journal or f"copy-journal-{journal_name}.jsonl",
+        force=args.force
+    )
 
-    publish_group(args.group_id, args.group_title, desc, abs_, api_key)
+    # ---------------- PLAN ----------------
+    print("\n################ PLAN ################")
 
-    # ---------------- ARTIFACTS ----------------
-    print("\n################ ARTIFACTS ################")
+    try:
+        targets = build_copy_plan(jobs)
+    except ValueError as e:
+        print("❌", e)
+        sys.exit(1)
 
-    artifacts = query_artifacts()
+    for group_id, target in targets.items():
+        print(
+            f"\n{group_id}: {len(target['artifacts'])} ARTIFACTS, "
+            f"{sum(len(v) for v in target['artifacts'].values())} VERSIONS"
+        )
 
-    print(f"\nFOUND {len(artifacts)} ARTIFACTS")
+    for group_id, target in targets.items():
 
-    for artifact_uri in artifacts:
+        # ---------------- GROUP ----------------
+        print(f"\n################ GROUP {group_id} ################")
 
         try:
+            desc, abs_ = fetch_group(target["source"])
+
+            publish_group(
+                group_id, target["title"], desc, abs_, api_key, journal
+            )
+        except Exception as e:
+            print("❌ FAILED:", group_id)
+            print(e)
+            # nothing in this group can be published without it
+            journal["failed"] += 1 + sum(
+                1 + len(v) for v in target["artifacts"].values()
+            )
+            continue
+
+        # ---------------- ARTIFACTS ----------------
+        print("\n################ ARTIFACTS ################")
+
+        for artifact_uri, versions in target["artifacts"].items():
+
             print("\n======================================")
 
-            publish_artifact(args.group_id, artifact_uri, api_key)
+            try:
+                publish_artifact(group_id, artifact_uri, api_key, journal)
+            except Exception as e:
+                print("❌ FAILED:", artifact_uri)
+                print(e)
+                # versions cannot be published without their artifact
+                journal["failed"] += 1 + len(versions)
+                continue
 
             artifact_id = artifact_uri.rstrip("/").split("/")[-1]
 
-            versions = query_versions(artifact_uri, args.graph)
-
             print(f"FOUND {len(versions)} VERSIONS")
 
             for v in versions:
-                publish_version(
-                    args.group_id,
-                    artifact_id,
-                    v,
-                    api_key
-                )
-
-        except Exception as e:
-            print("❌ FAILED:", artifact_uri)
-            print(e)
+                try:
+                    publish_version(
+                        group_id,
+                        artifact_id,
+                        v,
+                        api_key,
+                        journal
+                    )
+                except Exception as e:
+                    print("❌ FAILED:", v)
+                    print(e)
+                    journal["failed"] += 1
+
+    print_summary(journal)
+
+    if journal["failed"]:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
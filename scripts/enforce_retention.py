@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Description: Enforce the per-KG version retention policy declared in metadata.yaml.
+
+A KG opts in with a `retention` block:
+
+    retention:
+      keep-last: 10     # newest N versions of every artifact
+      keep-days: 365    # versions dated within the last N days
+
+A version is kept if it matches any of the given rules; versions whose
+id is not a date are always kept. All other versions are deleted from
+Databus in bulk and, once deleted, pruned from metadata.yaml. Versions
+whose deletion failed stay in the YAML and are retried on the next run.
+
+Usage: python3 enforce_retention.py [--dry-run] [--yes] <metadata.yaml>...
+"""
+
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+
+import yaml
+
+from kg_metadata import parse_version_date, version_uri
+from remove_group import delete_resources, print_report
+
+
+def expired_versions(artifact, retention, today=None):
+    """Return the version entries of an artifact that the policy drops."""
+    keep_last = retention.get("keep-last")
+    keep_days = retention.get("keep-days")
+
+    if keep_last is None and keep_days is None:
+        return []
+
+    # undated versions are never expired, by count or by age
+    dated = [e for e in artifact.get("versions", []) if parse_version_date(e.get("version")) is not None]
+
+    def sort_key(entry):
+        return (parse_version_date(entry.get("version")), str(entry.get("version")))
+
+    newest_first = sorted(dated, key=sort_key, reverse=True)
+
+    cutoff = None
+    if keep_days is not None:
+        cutoff = (today or date.today()) - timedelta(days=int(keep_days))
+
+    expired = []
+
+    for i, entry in enumerate(newest_first):
+        if keep_last is not None and i < int(keep_last):
+            continue
+
+        if cutoff is not None and parse_version_date(entry.get("version")) >= cutoff:
+            continue
+
+        expired.append(entry)
+
+    return expired
+
+
+def enforce(yaml_file, dry_run=False, assume_yes=False):
+    """Apply the retention policy of one metadata.yaml. Returns failed URIs."""
+    with open(yaml_file, "r") as f:
+        data = yaml.safe_load(f)
+
+    retention = (data or {}).get("retention")
+
+    if not retention:
+        print(f"ℹ️ No retention policy in {yaml_file}, skipping.")
+        return []
+
+    plan = []
+
+    for artifact in data.get("artifacts", []):
+        for entry in expired_versions(artifact, retention):
+            plan.append((artifact, entry, version_uri(data, artifact, entry)))
+
+    print(f"\n📋 {yaml_file}: {len(plan)} versions exceed the retention policy {retention}")
+
+    for _, _, uri in plan:
+        print(f"  - {uri}")
+
+    if not plan or dry_run:
+        return []
+
+    if not assume_yes:
+        confirm = input(f"\n⚠️  Type 'yes' to delete these {len(plan)} versions: ")
+        if confirm.strip().lower() != "yes":
+            print("Aborted.")
+            return []
+
+    api_key_env = data["databus-account"].upper().replace("-", "_")
+    api_key = os.environ.get(api_key_env)
+
+    if not api_key:
+        print(f"❌ {api_key_env} not set, cannot delete from Databus")
+        return [uri for _, _, uri in plan]
+
+    failed = delete_resources([uri for _, _, uri in plan], api_key)
+
+    pruned = 0
+    for artifact, entry, uri in plan:
+        if uri not in failed:
+            artifact["versions"].remove(entry)
+            pruned += 1
+
+    if pruned:
+        with open(yaml_file, "w") as f:
+            yaml.dump(data, f, sort_keys=False, allow_unicode=True)
+        print(f"💾 Pruned {pruned} versions from {yaml_file}")
+
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Enforce the retention policy declared in metadata.yaml files."
+    )
+    parser.add_argument("yaml_files", nargs="+")
+    parser.add_argument("--dry-run", action="store_true", help="only show the plan")
+    parser.add_argument("--yes", action="store_true", help="do not ask for confirmation")
+    args = parser.parse_args()
+
+    failed = []
+
+    for yaml_file in args.yaml_files:
+        failed += enforce(yaml_file, dry_run=args.dry_run, assume_yes=args.yes)
+
+    print_report(failed)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
+import json
 import os
 import re
+import tempfile
 from pathlib import Path
 
 import yaml
@@ -7,6 +9,36 @@ import yaml
 
 body = os.environ.get("ISSUE_BODY", "")
 
+# Sizes and ETags found by validate_new_kg.py
+PROBE_RESULTS_FILE = os.environ.get(
+    "KG_PROBE_RESULTS",
+    os.path.join(
+        tempfile.gettempdir(),
+        "kg-distribution-probes.json"
+    )
+)
+
+
+def load_probe_results():
+    """
+    URL -> {status, size, etag} from the validation step,
+    or an empty dict if it did not probe anything.
+    """
+
+    try:
+
+        with open(
+            PROBE_RESULTS_FILE,
+            "r",
+            encoding="utf-8"
+        ) as f:
+
+            return json.load(f)
+
+    except (OSError, ValueError):
+
+        return {}
+
 
 def normalize_value(value):
     """
@@ -222,7 +254,10 @@ if artifacts_text:
     )
 
 
-    # Ensure every distribution has status: pending
+    # Ensure every distribution has status: pending,
+    # and fill in sizes and ETags found during validation
+
+    probes = load_probe_results()
 
     if artifacts:
 
@@ -241,6 +276,20 @@ if artifacts_text:
                     distribution["status"] = "pending"
 
 
+                    probe = probes.get(
+                        distribution.get("file")
+                    )
+
+                    if not probe:
+                        continue
+
+                    if not distribution.get("size") and probe.get("size"):
+                        distribution["size"] = probe["size"]
+
+                    if probe.get("etag"):
+                        distribution["etag"] = probe["etag"]
+
+
 # --------------------------------------------------
 # Build metadata YAML
 # --------------------------------------------------
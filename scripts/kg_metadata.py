@@ -0,0 +1,322 @@
+"""
+Helpers shared by the scripts that read or update a KG's metadata.yaml.
+
+New versions are added with append_versions(), which inserts the new
+blocks into the existing text instead of dumping the whole document
+again, so untouched content keeps its layout and the cost depends on
+the size of the change, not of the file.
+"""
+
+import re
+from datetime import date, datetime
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+DATABUS_BASE = "https://databus.dbpedia.org"
+
+# Version strings used across the catalog (2025-01-01, 2026.04.17, 20250101)
+VERSION_DATE_FORMATS = ("%Y-%m-%d", "%Y.%m.%d", "%Y%m%d")
+
+# Line width used by yaml.dump, kept for the inserted blocks
+YAML_WIDTH = 80
+
+TOP_LEVEL_KEY = re.compile(r"^([^\s#'\"\-][^:]*):(.*)$")
+
+
+def parse_version_date(version):
+    """Return a version (YAML date or string) as a date, or None if it is not a date."""
+    if isinstance(version, datetime):
+        return version.date()
+
+    if isinstance(version, date):
+        return version
+
+    for fmt in VERSION_DATE_FORMATS:
+        try:
+            return datetime.strptime(str(version), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def latest_version(artifact):
+    """Return the newest dated version entry of an artifact, or None."""
+    dated = [
+        (parse_version_date(v.get("version")), i)
+        for i, v in enumerate(artifact.get("versions") or [])
+    ]
+    dated = [(d, i) for d, i in dated if d is not None]
+
+    if not dated:
+        return None
+
+    return artifact["versions"][max(dated)[1]]
+
+
+def release_dates(metadata):
+    """Return the sorted distinct version dates of all artifacts of a KG."""
+    dates = {
+        parse_version_date(v.get("version"))
+        for artifact in metadata.get("artifacts") or []
+        for v in artifact.get("versions") or []
+    }
+    dates.discard(None)
+    return sorted(dates)
+
+
+def version_uri(data, artifact, version):
+    """Databus URI of a version entry of a loaded metadata.yaml."""
+    artifact_id = artifact["artifact"].replace(" ", "-")
+    version_str = str(version["version"]).replace(" ", "-")
+    return f"{DATABUS_BASE}/{data['databus-account']}/{data['id']}/{artifact_id}/{version_str}"
+
+
+def load_metadata(metadata_file):
+    """Load a metadata.yaml, with libyaml's C parser when it is installed."""
+    with open(metadata_file, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=SafeLoader)
+
+
+def add_versions(metadata, proposals):
+    """
+    Append proposed version entries ({"artifact", "entry"} and optionally
+    "new-artifact") to a loaded metadata dict. Returns the applied proposals.
+    """
+    artifacts = {a.get("artifact"): a for a in metadata.get("artifacts") or []}
+    applied = []
+
+    for proposal in proposals:
+        artifact = artifacts.get(proposal["artifact"])
+        if artifact is None and proposal.get("new-artifact"):
+            artifact = dict(proposal["new-artifact"], versions=[])
+            metadata.setdefault("artifacts", []).append(artifact)
+            artifacts[proposal["artifact"]] = artifact
+        if artifact is None:
+            print(f"⚠️ Unknown artifact in proposal: {proposal['artifact']}")
+            continue
+        artifact.setdefault("versions", []).append(proposal["entry"])
+        applied.append(proposal)
+
+    return applied
+
+
+def dump_block(value, indent):
+    """yaml.dump a value as lines indented by `indent` spaces."""
+    text = yaml.dump(
+        value,
+        sort_keys=False,
+        allow_unicode=True,
+        default_flow_style=False,
+        width=YAML_WIDTH - indent,
+    )
+    return [" " * indent + line if line else line for line in text.splitlines()]
+
+
+def content_end(lines, start, end):
+    """Position after the last line in [start, end) that is not blank or a comment."""
+    while end > start and (not lines[end - 1].strip() or lines[end - 1].lstrip().startswith("#")):
+        end -= 1
+    return end
+
+
+def top_level_blocks(lines):
+    """Return {key: (start, end)} line ranges of the top-level mapping keys."""
+    blocks = {}
+    key = None
+
+    for i, line in enumerate(lines):
+        match = TOP_LEVEL_KEY.match(line)
+        if not match:
+            continue
+        if key is not None:
+            blocks[key] = (blocks[key][0], i)
+        key = match.group(1).strip()
+        if key in blocks:
+            raise ValueError(f"duplicate top-level key '{key}'")
+        blocks[key] = (i, len(lines))
+
+    return blocks
+
+
+def artifact_items(lines, start, end):
+    """
+    Index the block list under `artifacts:` (lines start..end).
+    Returns (item indent, {artifact id: {"start", "end", "versions"}}).
+    """
+    value = TOP_LEVEL_KEY.match(lines[start]).group(2).split("#", 1)[0].strip()
+    if value:
+        raise ValueError("'artifacts' is not a block list")
+
+    item_indent = None
+    items = []
+
+    for i in range(start + 1, end):
+        stripped = lines[i].lstrip(" ")
+        if not stripped or stripped.startswith("#"):
+            continue
+
+        indent = len(lines[i]) - len(stripped)
+        if item_indent is None:
+            item_indent = indent
+
+        if indent == item_indent and stripped.startswith("- "):
+            items.append({"start": i, "id": None, "versions": None})
+            stripped = stripped[2:].lstrip(" ")
+            indent = len(lines[i]) - len(stripped)
+        elif indent <= item_indent or not items:
+            raise ValueError(f"unexpected line {i + 1} in 'artifacts'")
+
+        if indent == item_indent + 2:
+            key, _, value = stripped.partition(":")
+            if key == "artifact":
+                items[-1]["id"] = yaml.safe_load(value)
+            elif key == "versions":
+                items[-1]["versions"] = i
+
+    by_id = {}
+    for n, item in enumerate(items):
+        item["end"] = items[n + 1]["start"] if n + 1 < len(items) else end
+        if item["id"] in by_id:
+            raise ValueError(f"duplicate artifact '{item['id']}'")
+        by_id[item["id"]] = item
+
+    return (0 if item_indent is None else item_indent), by_id
+
+
+def versions_indent(lines, versions_line, item_end, key_indent):
+    """Indent of the items of an artifact's `versions` list (sequences may be indented)."""
+    for i in range(versions_line + 1, item_end):
+        stripped = lines[i].lstrip(" ")
+        if not stripped or stripped.startswith("#"):
+            continue
+        indent = len(lines[i]) - len(stripped)
+        if indent >= key_indent and stripped.startswith("- "):
+            return indent
+        break
+
+    return key_indent
+
+
+def versions_end(lines, versions_line, item_end, key_indent):
+    """Position after the last line of an artifact's `versions` list."""
+    last = versions_line + 1
+
+    for i in range(versions_line + 1, item_end):
+        stripped = lines[i].lstrip(" ")
+        if not stripped or stripped.startswith("#"):
+            continue
+        indent = len(lines[i]) - len(stripped)
+        if indent > key_indent or (indent == key_indent and stripped.startswith("- ")):
+            last = i + 1
+            continue
+        break
+
+    return last
+
+
+def patch_lines(lines, proposals, settings):
+    """Return the document lines with the proposals and settings applied."""
+    blocks = top_level_blocks(lines)
+    if "artifacts" not in blocks or "artifacts" in settings:
+        raise ValueError("no top-level 'artifacts' list to append to")
+
+    start, end = blocks["artifacts"]
+    item_indent, items = artifact_items(lines, start, end)
+    key_indent = item_indent + 2
+
+    entries = {}
+    new_artifacts = {}
+
+    for proposal in proposals:
+        artifact_id = proposal["artifact"]
+        if artifact_id in items:
+            entries.setdefault(artifact_id, []).append(proposal["entry"])
+        elif artifact_id in new_artifacts:
+            new_artifacts[artifact_id]["versions"].append(proposal["entry"])
+        elif proposal.get("new-artifact"):
+            new_artifacts[artifact_id] = dict(proposal["new-artifact"], versions=[proposal["entry"]])
+
+    # (start, stop, new lines); edits at the same position keep this order
+    edits = []
+
+    for artifact_id, new_entries in entries.items():
+        item = items[artifact_id]
+        v = item["versions"]
+
+        if v is None:
+            at = content_end(lines, item["start"], item["end"])
+            edits.append((at, at, [" " * key_indent + "versions:"] + dump_block(new_entries, key_indent)))
+            continue
+
+        value = lines[v].split(":", 1)[1].split("#", 1)[0].strip()
+        if value == "[]":
+            edits.append((v, v + 1, [" " * key_indent + "versions:"] + dump_block(new_entries, key_indent)))
+        elif value:
+            raise ValueError(f"'versions' of '{artifact_id}' is not a block list")
+        else:
+            at = versions_end(lines, v, item["end"], key_indent)
+            indent = versions_indent(lines, v, item["end"], key_indent)
+            edits.append((at, at, dump_block(new_entries, indent)))
+
+    if new_artifacts:
+        at = content_end(lines, start + 1, end)
+        edits.append((at, at, dump_block(list(new_artifacts.values()), item_indent)))
+
+    for key, value in settings.items():
+        if key in blocks:
+            key_start, key_end = blocks[key]
+            edits.append((key_start, content_end(lines, key_start + 1, key_end), dump_block({key: value}, 0)))
+        else:
+            edits.append((start, start, dump_block({key: value}, 0)))
+
+    patched = []
+    pos = 0
+    for edit_start, edit_stop, new_lines in sorted(edits, key=lambda e: e[0]):
+        patched.extend(lines[pos:edit_start])
+        patched.extend(new_lines)
+        pos = max(pos, edit_stop)
+    patched.extend(lines[pos:])
+
+    return patched
+
+
+def append_versions(metadata_file, proposals, settings=None):
+    """
+    Add version entries to a metadata.yaml in place.
+
+    `proposals` use the daily_check.py format ({"artifact", "entry"}, plus
+    "new-artifact" for artifacts that are not in the file yet); `settings`
+    maps top-level keys to their new value. Only the affected lines are
+    written; files whose layout is not recognised, or whose patched text
+    does not load back to the expected document, are dumped as a whole.
+    """
+    settings = settings or {}
+
+    with open(metadata_file, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    metadata = yaml.load(text, Loader=SafeLoader)
+    add_versions(metadata, proposals)
+    metadata.update(settings)
+
+    try:
+        patched = "\n".join(patch_lines(text.splitlines(), proposals, settings)) + "\n"
+        # never write a patch that does not parse back to the expected document
+        try:
+            if yaml.load(patched, Loader=SafeLoader) != metadata:
+                raise ValueError("patched document differs from the expected one")
+        except yaml.YAMLError as e:
+            raise ValueError(f"patched document is not valid YAML: {e}") from e
+    except ValueError as e:
+        print(f"⚠️ Cannot patch {metadata_file} in place ({e}), rewriting it")
+        with open(metadata_file, "w", encoding="utf-8") as f:
+            yaml.dump(metadata, f, sort_keys=False, allow_unicode=True)
+        return
+
+    with open(metadata_file, "w", encoding="utf-8") as f:
+        f.write(patched)
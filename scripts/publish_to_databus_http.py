@@ -133,6 +133,10 @@ for artifact in data.get("artifacts", []):
     print(f"✅ Published artifact: {artifact_id}")
 
     for version in artifact.get("versions", []):
+        # versions whose files are gone upstream were removed from Databus
+        if version.get("retired"):
+            continue
+
         version_str = str(version["version"])
         version_id = f"{artifact_id}/{version_str.replace(' ', '-')}"
 
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Description: Generic release discovery driven by a `release-source` block in metadata.yaml.
+
+KGs without a `check-new-release` script can declare where their releases
+appear, and daily_check.py runs this module as their checker plugin.
+
+Directory listing (one regex over an index page):
+
+    release-source:
+      type: listing
+      url: https://example.org/dumps/
+      # `date` is required; `artifact` selects the artifact id, otherwise
+      # every match belongs to the artifact given below
+      pattern: '(?P<artifact>example_[a-z]+)_(?P<date>\\d{8})\\.ttl\\.bz2'
+      date-format: '%Y%m%d'
+      format: ttl
+      compression: bz2
+
+URL template (probe one candidate per cadence step):
+
+    release-source:
+      type: url-template
+      artifact: monthly-snapshot
+      url: https://example.org/{date:%Y}/dump-{date:%Y-%m-%d}.nt.gz
+      cadence: monthly        # daily | weekly | monthly | yearly
+      format: nt
+      compression: gz
+
+`release-source` may also be a list of such blocks. Optional keys:
+`artifact` (for listings without an artifact group) and `version-format`
+(strftime pattern for the YAML version; default is a plain date). Existing
+versions are read back with the same pattern, and a release whose version
+is already in metadata.yaml is never proposed again.
+
+Each listing URL is fetched once per run and parsed in a single pass;
+only candidates newer than the artifact's latest YAML version are
+probed, concurrently, for their size.
+
+Usage: python3 release_discovery.py <metadata.yaml>   (dry run, prints proposals)
+"""
+
+import calendar
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from urllib.parse import urljoin
+
+import requests
+import yaml
+
+from kg_metadata import latest_version, parse_version_date
+
+# Number of concurrent HEAD probes
+PROBE_WORKERS = 8
+
+# Seconds per listing GET / candidate HEAD
+TIMEOUT = 30
+
+# First candidate for url-template sources whose artifact has no dated version yet
+MAX_TEMPLATE_LOOKBACK = 366  # days
+
+
+def fetch_listing(url, session, cache):
+    """Return the listing page text, fetching each URL only once per run."""
+    if url not in cache:
+        response = session.get(url, timeout=TIMEOUT)
+        response.raise_for_status()
+        cache[url] = response.text
+    return cache[url]
+
+
+def probe_size(url, session):
+    """HEAD a candidate. Returns its size in bytes (0 if unknown) or None if missing."""
+    try:
+        response = session.head(url, allow_redirects=True, timeout=TIMEOUT)
+    except requests.RequestException as e:
+        print(f"⚠️ HEAD failed for {url}: {e}")
+        return None
+
+    if response.status_code != 200:
+        return None
+
+    return int(response.headers.get("Content-Length", 0))
+
+
+def listing_candidates(source, session, cache):
+    """Yield (artifact, date, url) for every release in a listing page."""
+    html = fetch_listing(source["url"], session, cache)
+    pattern = re.compile(source["pattern"])
+    date_format = source.get("date-format", "%Y%m%d")
+    seen = set()
+
+    for match in pattern.finditer(html):
+        filename = match.group(0)
+        if filename in seen:
+            continue
+        seen.add(filename)
+
+        try:
+            release_date = datetime.strptime(match.group("date"), date_format).date()
+        except ValueError:
+            print(f"Skipping invalid release date in {filename}")
+            continue
+
+        groups = match.groupdict()
+        artifact = groups.get("artifact") or source.get("artifact")
+
+        yield artifact, release_date, urljoin(source["url"], filename)
+
+
+def clamped_date(year, month, day):
+    return date(year, month, min(day, calendar.monthrange(year, month)[1]))
+
+
+def nth_step(anchor, cadence, n):
+    """The n-th cadence step after `anchor`; months keep the anchor's day where they can."""
+    if cadence == "daily":
+        return anchor + timedelta(days=n)
+    if cadence == "weekly":
+        return anchor + timedelta(weeks=n)
+    if cadence == "monthly":
+        months = anchor.month - 1 + n
+        return clamped_date(anchor.year + months // 12, months % 12 + 1, anchor.day)
+    if cadence == "yearly":
+        return clamped_date(anchor.year + n, anchor.month, anchor.day)
+    raise ValueError(f"Unknown cadence: {cadence}")
+
+
+def template_candidates(source, latest, today):
+    """Yield (artifact, date, url) for every cadence step after `latest` up to today."""
+    cadence = source.get("cadence", "monthly")
+
+    if latest is None:
+        anchor = today - timedelta(days=MAX_TEMPLATE_LOOKBACK)
+        if cadence == "monthly":
+            anchor = anchor.replace(day=1)
+        n = 0
+    else:
+        anchor = latest
+        n = 1
+
+    day = nth_step(anchor, cadence, n)
+    while day <= today:
+        yield source["artifact"], day, source["url"].format(date=day)
+        n += 1
+        day = nth_step(anchor, cadence, n)
+
+
+def version_string(source, release_date):
+    """The version of a release as written to (and read back from) metadata.yaml."""
+    version_format = source.get("version-format")
+    return release_date.strftime(version_format) if version_format else release_date.isoformat()
+
+
+def version_date(version, version_formats):
+    """Date of a YAML version, trying the sources' `version-format`s first."""
+    for version_format in version_formats:
+        try:
+            return datetime.strptime(str(version), version_format).date()
+        except ValueError:
+            continue
+    return parse_version_date(version)
+
+
+def create_version_entry(artifact, source, release_date, url, size, previous=None):
+    """New version entry, copying the metadata of the artifact's latest version."""
+    previous = previous or latest_version(artifact) or {}
+
+    entry = {
+        key: value
+        for key, value in previous.items()
+        if key not in ("version", "distributions")
+    }
+
+    entry["version"] = version_string(source, release_date) if source.get("version-format") else release_date
+    entry.setdefault("title", artifact.get("title") or artifact.get("artifact"))
+
+    entry["distributions"] = [
+        {
+            "file": url,
+            "format": source.get("format"),
+            "compression": source.get("compression"),
+            "size": size,
+            "sha256": None,
+            "status": "pending"
+        }
+    ]
+
+    return entry
+
+
+def discover(metadata, session, today=None, executor=ThreadPoolExecutor):
+    """Return the proposals (see daily_check.py) for every new release."""
+    today = today or date.today()
+    sources = metadata.get("release-source") or []
+    if isinstance(sources, dict):
+        sources = [sources]
+
+    artifacts = {a.get("artifact"): a for a in metadata.get("artifacts", [])}
+    version_formats = [s["version-format"] for s in sources if s.get("version-format")]
+
+    latest = {}
+    latest_entry = {}
+    existing = {}
+    for artifact_id, artifact in artifacts.items():
+        versions = artifact.get("versions") or []
+        dated = [(version_date(v.get("version"), version_formats), i) for i, v in enumerate(versions)]
+        dated = [(d, i) for d, i in dated if d is not None]
+        newest = max(dated, default=None)
+        latest[artifact_id] = newest[0] if newest else None
+        latest_entry[artifact_id] = versions[newest[1]] if newest else None
+        existing[artifact_id] = {str(v.get("version")) for v in versions}
+
+    cache = {}
+    candidates = {}
+
+    for source in sources:
+        if source.get("type", "listing") == "listing":
+            found = listing_candidates(source, session, cache)
+        else:
+            found = template_candidates(source, latest.get(source.get("artifact")), today)
+
+        for artifact_id, release_date, url in found:
+            if artifact_id not in artifacts:
+                continue
+
+            current = latest[artifact_id]
+            if current is not None and release_date <= current:
+                continue
+
+            # e.g. a `%Y-%m` version that is already in the file
+            version = version_string(source, release_date)
+            if version in existing[artifact_id]:
+                continue
+            existing[artifact_id].add(version)
+
+            candidates.setdefault(url, (artifact_id, release_date, source))
+
+    print(f"{len(candidates)} new candidate releases to probe")
+
+    urls = list(candidates)
+    with executor(max_workers=PROBE_WORKERS) as pool:
+        sizes = list(pool.map(lambda url: probe_size(url, session), urls))
+
+    found = [
+        (candidates[url][1], candidates[url][0], url, size, candidates[url][2])
+        for url, size in zip(urls, sizes)
+        if size is not None
+    ]
+
+    proposals = []
+    for release_date, artifact_id, url, size, source in sorted(found, key=lambda f: (f[0], f[1])):
+        print(f"Adding {artifact_id} {release_date}: {url}")
+        entry = create_version_entry(artifacts[artifact_id], source, release_date, url, size, latest_entry[artifact_id])
+        if metadata.get("license"):
+            entry.setdefault("license", metadata["license"])
+        proposals.append({"artifact": artifact_id, "entry": entry})
+
+    return proposals
+
+
+def check(metadata, context):
+    """Plugin entry point for daily_check.py."""
+    return discover(metadata, context.session, executor=context.executor)
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python3 release_discovery.py <metadata.yaml>")
+        sys.exit(1)
+
+    with open(sys.argv[1], "r") as f:
+        metadata = yaml.safe_load(f)
+
+    for proposal in discover(metadata, requests.Session()):
+        print(yaml.dump(proposal, sort_keys=False, allow_unicode=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -5,16 +5,32 @@ Author: Milan Dojchinovski
 Email: dojcinovski.milan@gmail.com
 Date: 2025-06-09
 License: CC BY 4.0
+
+Can also be used in-process:
+
+    from remove_group import remove_group
+    failed = remove_group(user, group, api_key)
 """
 
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
 from SPARQLWrapper import SPARQLWrapper, JSON
 
 # Base configuration
 DATABUS_BASE = "https://databus.dbpedia.org"
 SPARQL_ENDPOINT = "https://databus.dbpedia.org/sparql"
 
+SPARQL_PAGE_SIZE = 10000
+
+# Deletion engine defaults
+MAX_WORKERS = 8
+MAX_RETRIES = 3
+RETRY_BACKOFF = 2  # seconds, doubled after every attempt
+
 
 def query_sparql(query):
     """Run a SPARQL query and return results as bindings."""
@@ -25,47 +41,156 @@ def query_sparql(query):
     return results["results"]["bindings"]
 
 
-def get_artifacts(user, group):
-    """Return a list of artifact URIs for the given user/group."""
-    query = f"""
-    PREFIX databus: <https://dataid.dbpedia.org/databus#>
-    SELECT DISTINCT ?artifact WHERE {{
-      ?artifact databus:group <https://databus.dbpedia.org/{user}/{group}> .
-      ?artifact a databus:Artifact .
-    }}
+def get_group_content(user, group):
     """
-    results = query_sparql(query)
-    return [r["artifact"]["value"] for r in results]
-
-
-def get_versions(user, group):
-    """Return a list of version URIs for the given user/group."""
-    query = f"""
-    PREFIX databus: <https://dataid.dbpedia.org/databus#>
-    SELECT DISTINCT ?version WHERE {{
-      ?version databus:group <https://databus.dbpedia.org/{user}/{group}> .
-      ?version a databus:Version .
-    }}
+    Return the artifact URIs and {version URI: artifact URI} of the given
+    user/group, using one paginated query for both levels.
     """
-    results = query_sparql(query)
-    return [r["version"]["value"] for r in results]
-
+    artifacts = []
+    versions = {}
+    offset = 0
+
+    while True:
+        query = f"""
+        PREFIX databus: <https://dataid.dbpedia.org/databus#>
+        SELECT DISTINCT ?resource ?type ?artifact WHERE {{
+          ?resource databus:group <{DATABUS_BASE}/{user}/{group}> .
+          ?resource a ?type .
+          VALUES ?type {{ databus:Artifact databus:Version }}
+          OPTIONAL {{ ?resource databus:artifact ?artifact . }}
+        }}
+        ORDER BY ?resource
+        LIMIT {SPARQL_PAGE_SIZE}
+        OFFSET {offset}
+        """
+        results = query_sparql(query)
+
+        for r in results:
+            uri = r["resource"]["value"]
+            if r["type"]["value"].endswith("#Artifact"):
+                artifacts.append(uri)
+            else:
+                versions[uri] = r.get("artifact", {}).get("value")
+
+        if len(results) < SPARQL_PAGE_SIZE:
+            return artifacts, versions
+
+        offset += SPARQL_PAGE_SIZE
+
+
+def create_session(workers=MAX_WORKERS):
+    """Return a session whose connection pool fits all worker threads."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def delete_resource(uri, api_key, session=None, retries=MAX_RETRIES):
+    """
+    Delete a Databus resource using the REST API.
 
-def delete_resource(uri, api_key):
-    """Delete a Databus resource using the REST API."""
+    Retries on network errors, 429 and 5xx responses. A 404 counts as
+    deleted, so interrupted runs can simply be repeated.
+    Returns True on success.
+    """
     headers = {
         "accept": "application/json",
         "X-API-KEY": api_key,
         "Content-Type": "application/ld+json",
     }
 
-    print(f"🗑️  Deleting: {uri}")
-    response = requests.delete(uri, headers=headers)
+    http = session or requests
+    delay = RETRY_BACKOFF
+
+    for attempt in range(1, retries + 1):
+        try:
+            response = http.delete(uri, headers=headers, timeout=60)
+        except requests.RequestException as e:
+            reason = str(e)
+        else:
+            if response.status_code in (200, 204, 404):
+                print(f"✅ Deleted: {uri}")
+                return True
+
+            reason = f"{response.status_code}: {response.text}"
+
+            if response.status_code != 429 and response.status_code < 500:
+                break
+
+        if attempt < retries:
+            time.sleep(delay)
+            delay *= 2
+
+    print(f"❌ Failed to delete {uri} — {reason}")
+    return False
+
+
+def delete_resources(uris, api_key, workers=MAX_WORKERS, retries=MAX_RETRIES, session=None):
+    """
+    Delete all given URIs concurrently. Returns the list of URIs that
+    could not be deleted.
+    """
+    if not uris:
+        return []
+
+    session = session or create_session(workers)
 
-    if response.status_code in (200, 204):
-        print("✅ Deleted successfully")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(
+            lambda uri: delete_resource(uri, api_key, session, retries),
+            uris
+        )
+        return [uri for uri, ok in zip(uris, results) if not ok]
+
+
+def remove_group(user, group, api_key, workers=MAX_WORKERS, retries=MAX_RETRIES):
+    """
+    Remove a group with all its versions and artifacts, level by level.
+    Non-interactive; returns the list of URIs that could not be deleted.
+    """
+    session = create_session(workers)
+
+    print(f"\n📦 Fetching all artifacts and versions in group '{group}'...")
+    artifacts, versions = get_group_content(user, group)
+    print(f"Found {len(artifacts)} artifacts and {len(versions)} versions")
+
+    print(f"\n🗑️  Deleting {len(versions)} versions...")
+    failed = delete_resources(list(versions), api_key, workers, retries, session)
+
+    # an artifact is only deleted once none of its versions is left
+    blocked = {versions[uri] for uri in failed}
+    kept = [uri for uri in artifacts if uri in blocked]
+    if kept:
+        print(f"\n⚠️  Keeping {len(kept)} artifacts whose versions could not be deleted")
+
+    print(f"\n🗑️  Deleting {len(artifacts) - len(kept)} artifacts...")
+    failed += kept
+    failed += delete_resources([uri for uri in artifacts if uri not in blocked], api_key, workers, retries, session)
+
+    group_uri = f"{DATABUS_BASE}/{user}/{group}"
+
+    if failed:
+        print(f"\n⚠️  Keeping group '{group}': {len(failed)} resources are left")
+        failed.append(group_uri)
     else:
-        print(f"❌ Failed to delete {uri} — {response.status_code}: {response.text}")
+        print(f"\n🧹 Deleting group '{group}' itself...")
+        if not delete_resource(group_uri, api_key, session, retries):
+            failed.append(group_uri)
+
+    return failed
+
+
+def print_report(failed):
+    """Print the URIs that could not be deleted."""
+    if not failed:
+        print("\n✅ All deletions completed successfully.")
+        return
+
+    print(f"\n❌ {len(failed)} resources could not be deleted:")
+    for uri in failed:
+        print(f"  - {uri}")
 
 
 def main():
@@ -79,24 +204,12 @@ def main():
 
     print(f"🚀 Removing Databus group '{group}' for account '{user}'...")
 
-    # Fetch and delete all versions
-    print(f"\n📦 Fetching all versions in group '{group}'...")
-    versions = get_versions(user, group)
-    for version_uri in versions:
-        delete_resource(version_uri, api_key)
-
-    # Fetch and delete all artifacts
-    print(f"\n📚 Fetching all artifacts in group '{group}'...")
-    artifacts = get_artifacts(user, group)
-    for artifact_uri in artifacts:
-        delete_resource(artifact_uri, api_key)
+    failed = remove_group(user, group, api_key)
 
-    # Finally, delete the group
-    print(f"\n🧹 Deleting group '{group}' itself...")
-    group_uri = f"{DATABUS_BASE}/{user}/{group}"
-    delete_resource(group_uri, api_key)
+    print_report(failed)
 
-    print("\n✅ All deletions completed successfully.")
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -7,9 +7,16 @@ Date: 2026-07-13
 License: CC BY 4.0
 """
 
+import argparse
+import fnmatch
 import sys
+from datetime import date
+
 import requests
 
+from kg_metadata import parse_version_date
+from remove_group import SPARQL_PAGE_SIZE, delete_resources, print_report, query_sparql
+
 # Base configuration
 DATABUS_BASE = "https://databus.dbpedia.org"
 
@@ -35,13 +42,167 @@ def delete_resource(uri, api_key):
         print(response.text)
 
 
+def get_versions(user, group):
+    """Return (artifact id, version, version URI) for every version of a group."""
+    versions = []
+    offset = 0
+
+    while True:
+        query = f"""
+        PREFIX databus: <https://dataid.dbpedia.org/databus#>
+        PREFIX dct: <http://purl.org/dc/terms/>
+        SELECT DISTINCT ?artifact ?version ?hasVersion WHERE {{
+          ?version databus:group <{DATABUS_BASE}/{user}/{group}> .
+          ?version a databus:Version .
+          ?version databus:artifact ?artifact .
+          OPTIONAL {{ ?version dct:hasVersion ?hasVersion . }}
+        }}
+        ORDER BY ?version
+        LIMIT {SPARQL_PAGE_SIZE}
+        OFFSET {offset}
+        """
+        results = query_sparql(query)
+
+        for r in results:
+            uri = r["version"]["value"]
+            artifact = r["artifact"]["value"].rstrip("/").split("/")[-1]
+            version = r.get("hasVersion", {}).get("value") or uri.rstrip("/").split("/")[-1]
+            versions.append((artifact, version, uri))
+
+        if len(results) < SPARQL_PAGE_SIZE:
+            return versions
+
+        offset += SPARQL_PAGE_SIZE
+
+
+def select_versions(versions, artifact_glob=None, since=None, until=None, keep_latest=None):
+    """
+    Filter (artifact, version, uri) tuples; all given predicates must match.
+
+    since/until select versions whose date lies in the (inclusive) range,
+    keep_latest selects everything older than the newest N dated versions
+    of each artifact. Versions that are not dates never match since, until
+    or keep_latest, so they are only selected by the artifact glob alone.
+    """
+    if artifact_glob:
+        versions = [v for v in versions if fnmatch.fnmatch(v[0], artifact_glob)]
+
+    if since or until or keep_latest is not None:
+        versions = [v for v in versions if parse_version_date(v[1]) is not None]
+
+    def sort_key(entry):
+        d = parse_version_date(entry[1])
+        return (d or date.min, entry[1])
+
+    selected = []
+
+    by_artifact = {}
+    for entry in versions:
+        by_artifact.setdefault(entry[0], []).append(entry)
+
+    for artifact in sorted(by_artifact):
+        entries = sorted(by_artifact[artifact], key=sort_key, reverse=True)
+
+        if keep_latest is not None:
+            entries = entries[keep_latest:]
+
+        for entry in entries:
+            d = parse_version_date(entry[1])
+
+            if since and d < since:
+                continue
+            if until and d > until:
+                continue
+
+            selected.append(entry)
+
+    return sorted(selected, key=lambda e: (e[0],) + sort_key(e))
+
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(
+        prog="remove_version.py --batch",
+        description="Remove all versions of a group matching the given predicates."
+    )
+    parser.add_argument("user", help="Databus account")
+    parser.add_argument("group", help="Databus group id")
+    parser.add_argument("api_key")
+    parser.add_argument("--artifact", help="artifact id glob, e.g. 'en_dbnary_*'")
+    parser.add_argument("--since", type=date.fromisoformat, help="YYYY-MM-DD, inclusive")
+    parser.add_argument("--until", type=date.fromisoformat, help="YYYY-MM-DD, inclusive")
+    parser.add_argument(
+        "--keep-latest",
+        type=int,
+        metavar="N",
+        help="select dated versions older than the newest N of each artifact"
+    )
+    parser.add_argument("--yes", action="store_true", help="do not ask for confirmation")
+    args = parser.parse_args(argv)
+
+    if not (args.artifact or args.since or args.until or args.keep_latest is not None):
+        parser.error("give at least one of --artifact, --since, --until, --keep-latest")
+
+    if args.keep_latest is not None and args.keep_latest < 0:
+        parser.error("--keep-latest must not be negative")
+
+    versions = get_versions(args.user, args.group)
+
+    selected = select_versions(
+        versions,
+        artifact_glob=args.artifact,
+        since=args.since,
+        until=args.until,
+        keep_latest=args.keep_latest
+    )
+
+    print("==============================================")
+    print("DBpedia Databus Batch Version Deletion")
+    print("==============================================")
+    print(f"Account : {args.user}")
+    print(f"Group   : {args.group}")
+    print(f"Matched : {len(selected)} of {len(versions)} versions")
+    print("----------------------------------------------")
+    for artifact, version, _ in selected:
+        print(f"{artifact:40} {version}")
+    print("==============================================")
+
+    if not selected:
+        print("Nothing to delete.")
+        return
+
+    if not args.yes:
+        confirm = input(
+            f"\n⚠️  Type 'yes' to permanently delete these {len(selected)} versions: "
+        )
+
+        if confirm.strip().lower() != "yes":
+            print("Aborted.")
+            sys.exit(0)
+
+    failed = delete_resources([uri for _, _, uri in selected], args.api_key)
+
+    print_report(failed)
+
+    if failed:
+        sys.exit(1)
+
+
 def main():
 
+    if "--batch" in sys.argv[1:]:
+        argv = [a for a in sys.argv[1:] if a != "--batch"]
+        batch_main(argv)
+        return
+
     if len(sys.argv) != 6:
         print(
             "Usage:\n"
             "python3 remove-version.py "
-            "<databus-account> <group-id> <artifact-id> <version> <api-key>"
+            "<databus-account> <group-id> <artifact-id> <version> <api-key>\n"
+            "python3 remove-version.py --batch "
+            "<databus-account> <group-id> <api-key> "
+            "[--artifact GLOB] [--since DATE] [--until DATE] "
+            "[--keep-latest N] [--yes]"
         )
         sys.exit(1)
 
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Description: Check declared `format`/`compression` of distributions against their bytes.
+
+Only the first SNIFF_BYTES of every file are downloaded (Range request).
+The compression is detected from its magic bytes, and the RDF
+serialization from the decompressed prefix. All distributions of the
+catalog are sniffed concurrently, at most PER_HOST_LIMIT per host.
+
+bz2 emits nothing before a whole block (up to 900 kB uncompressed) is
+read, so a bz2 file whose prefix decodes to nothing is fetched again
+with BZ2_SNIFF_BYTES. A format that still cannot be recognised is
+reported as unknown, never as a mismatch.
+
+Usage: python3 sniff_formats.py [--bytes N] [<metadata.yaml>...]
+       (defaults to knowledge-graphs/*/metadata.yaml; exits 1 on mismatches)
+"""
+
+import argparse
+import bz2
+import glob
+import lzma
+import os
+import re
+import sys
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from kg_metadata import load_metadata
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+# Bytes fetched per file, and for bz2 files whose prefix held no whole block
+SNIFF_BYTES = 64 * 1024
+BZ2_SNIFF_BYTES = 1024 * 1024
+
+MAX_WORKERS = 16
+PER_HOST_LIMIT = 4
+TIMEOUT = 30
+
+# Leading bytes of each compression format
+MAGIC = [
+    (b"\x1f\x8b", "gz"),
+    (b"BZh", "bz2"),
+    (b"\xfd7zXZ\x00", "xz"),
+    (b"\x28\xb5\x2f\xfd", "zst"),
+    (b"PK\x03\x04", "zip"),
+]
+
+# Spellings of the same compression in metadata.yaml
+COMPRESSION_ALIASES = {None: "none", "": "none", "gzip": "gz", "bzip2": "bz2"}
+
+# Detected formats accepted for a declared one (N-Triples is valid Turtle)
+COMPATIBLE_FORMATS = {"ttl": {"ttl", "nt"}, "nq": {"nq", "nt"}, "trig": {"trig", "ttl", "nt", "nq"}}
+
+TURTLE_DIRECTIVE = re.compile(r"^\s*(@prefix|@base|PREFIX|BASE)\s", re.I | re.M)
+TERM = r"(?:<[^>]*>|_:\S+)"
+LITERAL_OR_TERM = r"(?:<[^>]*>|_:\S+|\"(?:[^\"\\]|\\.)*\"(?:@[\w-]+|\^\^<[^>]*>)?)"
+NTRIPLE = re.compile(rf"^{TERM}\s+<[^>]*>\s+{LITERAL_OR_TERM}\s*\.\s*$")
+NQUAD = re.compile(rf"^{TERM}\s+<[^>]*>\s+{LITERAL_OR_TERM}\s+{TERM}\s*\.\s*$")
+
+
+def create_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def fetch_prefix(url, session, size=SNIFF_BYTES):
+    """Return the first `size` bytes of a file, as sent (no transfer decoding)."""
+    response = session.get(
+        url,
+        headers={"Range": f"bytes=0-{size - 1}"},
+        stream=True,
+        allow_redirects=True,
+        timeout=TIMEOUT,
+    )
+    try:
+        if response.status_code not in (200, 206):
+            raise requests.HTTPError(f"HTTP {response.status_code}")
+        # servers that ignore Range send the whole file; stop reading early
+        return response.raw.read(size, decode_content=False)
+    finally:
+        response.close()
+
+
+def detect_compression(data):
+    for magic, name in MAGIC:
+        if data.startswith(magic):
+            return name
+    return "none"
+
+
+def decompress_prefix(data, compression):
+    """Decompress as much of a truncated stream as possible; b"" if not possible."""
+    try:
+        if compression == "gz":
+            return zlib.decompressobj(wbits=zlib.MAX_WBITS | 32).decompress(data)
+        if compression == "bz2":
+            return bz2.BZ2Decompressor().decompress(data)
+        if compression == "xz":
+            return lzma.LZMADecompressor().decompress(data)
+    except (zlib.error, OSError, EOFError, lzma.LZMAError):
+        return b""
+    if compression == "none":
+        return data
+    return b""
+
+
+def detect_format(data):
+    """Guess the RDF serialization of a (possibly truncated) file prefix."""
+    if data.startswith(b"$HDT"):
+        return "hdt"
+
+    text = data.decode("utf-8", errors="ignore").lstrip("\ufeff \t\r\n")
+    if not text:
+        return None
+
+    if text.startswith("<?xml") or text.startswith("<rdf:RDF"):
+        return "rdf"
+
+    if text[0] in "{[":
+        return "jsonld"
+
+    if TURTLE_DIRECTIVE.search(text):
+        return "ttl"
+
+    # the last line may be cut off
+    lines = [line for line in text.splitlines()[:-1] if line.strip() and not line.startswith("#")][:50]
+    if lines and all(NTRIPLE.match(line) for line in lines):
+        return "nt"
+    if lines and all(NTRIPLE.match(line) or NQUAD.match(line) for line in lines):
+        return "nq"
+    if lines and text[0] in "<_":
+        return "ttl"
+
+    return None
+
+
+def sniff(url, session, host_limits, size=SNIFF_BYTES):
+    """Return {compression, format, bytes} or {error} for a file URL."""
+    transferred = 0
+
+    with host_limits[urlparse(url).netloc]:
+        try:
+            data = fetch_prefix(url, session, size)
+            transferred += len(data)
+            compression = detect_compression(data)
+            decoded = decompress_prefix(data, compression)
+
+            if compression == "bz2" and not decoded and len(data) == size < BZ2_SNIFF_BYTES:
+                data = fetch_prefix(url, session, BZ2_SNIFF_BYTES)
+                transferred += len(data)
+                decoded = decompress_prefix(data, compression)
+        except requests.RequestException as e:
+            return {"error": str(e)}
+
+    return {
+        "compression": compression,
+        "format": detect_format(decoded),
+        "bytes": transferred,
+    }
+
+
+def check_distribution(dist, result):
+    """Return the mismatch messages of a distribution's sniff result."""
+    problems = []
+
+    declared_compression = str(dist.get("compression") or "").lower()
+    declared_compression = COMPRESSION_ALIASES.get(declared_compression, declared_compression)
+    if result["compression"] != declared_compression:
+        problems.append(f"compression declared '{declared_compression}', file is '{result['compression']}'")
+
+    declared_format = str(dist.get("format") or "").lower()
+    detected = result["format"]
+    if detected and declared_format and detected not in COMPATIBLE_FORMATS.get(declared_format, {declared_format}):
+        problems.append(f"format declared '{declared_format}', file looks like '{detected}'")
+
+    return problems
+
+
+def collect_distributions(yaml_files):
+    """Return (yaml file, distribution) for every published distribution."""
+    found = []
+    for yaml_file in yaml_files:
+        data = load_metadata(yaml_file) or {}
+        for artifact in data.get("artifacts") or []:
+            for version in artifact.get("versions") or []:
+                if version.get("retired"):
+                    continue
+                for dist in version.get("distributions") or []:
+                    if dist.get("file") and dist.get("status") != "gone":
+                        found.append((yaml_file, dist))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sniff distribution formats and compressions.")
+    parser.add_argument("yaml_files", nargs="*")
+    parser.add_argument("--bytes", type=int, default=SNIFF_BYTES, help="bytes fetched per file")
+    args = parser.parse_args()
+
+    yaml_files = args.yaml_files or sorted(glob.glob(os.path.join(REPO_ROOT, "knowledge-graphs", "*", "metadata.yaml")))
+    distributions = collect_distributions(yaml_files)
+    urls = sorted({dist["file"] for _, dist in distributions})
+
+    print(f"🔍 Sniffing {len(urls)} files ({args.bytes} bytes each)...")
+
+    session = create_session()
+    host_limits = {urlparse(url).netloc: threading.BoundedSemaphore(PER_HOST_LIMIT) for url in urls}
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        results = dict(zip(urls, pool.map(lambda url: sniff(url, session, host_limits, args.bytes), urls)))
+
+    for url, result in results.items():
+        if "error" in result:
+            print(f"⚠️ {url}: {result['error']}")
+
+    mismatches = 0
+    for yaml_file, dist in distributions:
+        result = results[dist["file"]]
+        if "error" in result:
+            continue
+
+        for problem in check_distribution(dist, result):
+            mismatches += 1
+            print(f"❌ {os.path.relpath(yaml_file, REPO_ROOT)}: {dist['file']}: {problem}")
+
+    unreachable = sum(1 for r in results.values() if "error" in r)
+    unknown = sum(1 for r in results.values() if "error" not in r and r["format"] is None)
+
+    transferred = sum(r.get("bytes", 0) for r in results.values())
+    declared = sum({dist["file"]: dist.get("size") or 0 for _, dist in distributions}.values())
+    print(
+        f"\n📋 {len(urls)} files: {mismatches} mismatches, {unknown} formats not recognisable "
+        f"from the prefix, {unreachable} unreachable; "
+        f"{transferred / 1024 ** 2:.1f} MiB read of {declared / 1024 ** 3:.1f} GiB declared"
+    )
+
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Description: Validate the structure of every KG's metadata.yaml in one process.
+
+The schema below is compiled once into nested check functions. Results
+are cached by the SHA-256 of each file's content (and of the schema), so
+unchanged files are neither parsed nor checked again.
+
+Usage: python3 validate_metadata.py [--no-cache] [<metadata.yaml>...]
+       (defaults to knowledge-graphs/*/metadata.yaml)
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from datetime import date
+
+import yaml
+
+from kg_metadata import SafeLoader
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+CACHE_FILE = os.path.join(REPO_ROOT, ".metadata-validation-cache.json")
+
+URL_PATTERN = r"^https?://\S+$"
+
+DISTRIBUTION = {
+    "type": dict,
+    "required": ["file"],
+    "keys": {
+        "file": {"type": str, "pattern": URL_PATTERN},
+        "format": {"type": str, "nullable": True},
+        "compression": {"type": str, "nullable": True},
+        "size": {"type": int, "nullable": True, "min": 0},
+        "sha256": {"type": str, "nullable": True, "pattern": r"^([0-9a-f]{64}|missing)$"},
+        "status": {"type": str, "enum": ["pending", "active", "error", "gone"]},
+    },
+}
+
+VERSION = {
+    "type": dict,
+    "required": ["version", "title", "distributions"],
+    "keys": {
+        "version": {"type": (str, date, int)},
+        "title": {"type": str},
+        "abstract": {"type": str},
+        "description": {"type": str},
+        "license": {"type": str, "pattern": URL_PATTERN},
+        "retired": {"type": (date, str)},
+        "distributions": {"type": list, "items": DISTRIBUTION},
+    },
+}
+
+ARTIFACT = {
+    "type": dict,
+    "required": ["artifact", "title"],
+    "keys": {
+        "artifact": {"type": str},
+        "title": {"type": str},
+        "abstract": {"type": str},
+        "description": {"type": str},
+        "versions": {"type": list, "items": VERSION, "unique": "version"},
+    },
+}
+
+SCHEMA = {
+    "type": dict,
+    "required": ["databus-account", "id", "title"],
+    "keys": {
+        "databus-account": {"type": str, "pattern": r"^[a-z0-9-]+$"},
+        "id": {"type": str, "pattern": r"^[A-Za-z0-9._-]+$"},
+        "title": {"type": str},
+        "abstract": {"type": str},
+        "description": {"type": str},
+        "homepage": {"type": str, "pattern": URL_PATTERN},
+        "license": {"type": str, "pattern": URL_PATTERN},
+        "check-new-release": {"type": str},
+        "check-new-release-timeout": {"type": int, "min": 1},
+        "check-schedule": {"type": str, "enum": ["adaptive", "daily"]},
+        "databus-publish": {"type": bool},
+        "moss-publish": {"type": bool},
+        "last-version-size": {"type": int, "min": 0},
+        "keywords": {"type": list, "items": {"type": str}},
+        "domains": {"type": list, "items": {"type": str}},
+        "internal_namespaces": {"type": list, "items": {"type": str}},
+        "sparql": {
+            "type": list,
+            "items": {
+                "type": dict,
+                "required": ["url"],
+                "keys": {"name": {"type": str}, "url": {"type": str, "pattern": URL_PATTERN}},
+            },
+        },
+        "maintainers": {"type": list, "items": {"type": dict, "keys": {"name": {"type": str}}}},
+        "retention": {
+            "type": dict,
+            "keys": {"keep-last": {"type": int, "min": 1}, "keep-days": {"type": int, "min": 1}},
+        },
+        "artifacts": {"type": list, "items": ARTIFACT, "unique": "artifact"},
+    },
+}
+
+# Changing the schema invalidates every cached result
+SCHEMA_HASH = hashlib.sha256(repr(SCHEMA).encode()).hexdigest()
+
+
+def type_name(expected):
+    if isinstance(expected, tuple):
+        return " or ".join(t.__name__ for t in expected)
+    return expected.__name__
+
+
+def compile_schema(schema):
+    """Turn a schema node into a function check(value, path, errors)."""
+    checks = []
+    expected = schema.get("type")
+    nullable = schema.get("nullable", False)
+
+    if expected is not None:
+        # bool is a subclass of int, but true/false is never a valid number
+        strict = expected is int or (isinstance(expected, tuple) and int in expected)
+
+        def check_type(value, path, errors):
+            if strict and isinstance(value, bool):
+                errors.append(f"{path}: expected {type_name(expected)}, got bool")
+                return False
+            if not isinstance(value, expected):
+                errors.append(f"{path}: expected {type_name(expected)}, got {type(value).__name__}")
+                return False
+            return True
+    else:
+        def check_type(value, path, errors):
+            return True
+
+    if "pattern" in schema:
+        pattern = re.compile(schema["pattern"])
+
+        def check_pattern(value, path, errors):
+            if isinstance(value, str) and not pattern.match(value):
+                errors.append(f"{path}: {value!r} does not match {schema['pattern']}")
+        checks.append(check_pattern)
+
+    if "enum" in schema:
+        allowed = set(schema["enum"])
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append(f"{path}: {value!r} is not one of {sorted(allowed)}")
+        checks.append(check_enum)
+
+    if "min" in schema:
+        minimum = schema["min"]
+
+        def check_min(value, path, errors):
+            if value < minimum:
+                errors.append(f"{path}: {value} is below {minimum}")
+        checks.append(check_min)
+
+    if "required" in schema or "keys" in schema:
+        required = schema.get("required", [])
+        keys = {key: compile_schema(node) for key, node in schema.get("keys", {}).items()}
+
+        def check_keys(value, path, errors):
+            for key in required:
+                if key not in value:
+                    errors.append(f"{path}: missing required key '{key}'")
+            for key, check in keys.items():
+                if key in value:
+                    check(value[key], f"{path}.{key}", errors)
+        checks.append(check_keys)
+
+    if "items" in schema:
+        item_check = compile_schema(schema["items"])
+        unique = schema.get("unique")
+
+        def check_items(value, path, errors):
+            seen = set()
+            for i, item in enumerate(value):
+                item_check(item, f"{path}[{i}]", errors)
+                if unique and isinstance(item, dict) and item.get(unique) is not None:
+                    key = str(item[unique])
+                    if key in seen:
+                        errors.append(f"{path}[{i}]: duplicate {unique} '{key}'")
+                    seen.add(key)
+        checks.append(check_items)
+
+    def check(value, path, errors):
+        if value is None:
+            if not nullable:
+                errors.append(f"{path}: must not be empty")
+            return
+        if check_type(value, path, errors):
+            for c in checks:
+                c(value, path, errors)
+
+    return check
+
+
+VALIDATE = compile_schema(SCHEMA)
+
+
+def validate_text(text):
+    """Return the list of schema errors of a metadata.yaml's content."""
+    try:
+        data = yaml.load(text, Loader=SafeLoader)
+    except yaml.YAMLError as e:
+        return [f"YAML syntax error: {e}"]
+
+    errors = []
+    VALIDATE(data, "metadata", errors)
+    return errors
+
+
+def load_cache():
+    try:
+        with open(CACHE_FILE, "r") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if cache.get("schema") != SCHEMA_HASH:
+        return {}
+
+    return cache.get("files", {})
+
+
+def save_cache(results):
+    with open(CACHE_FILE, "w") as f:
+        json.dump({"schema": SCHEMA_HASH, "files": results}, f, indent=1, sort_keys=True)
+
+
+def validate_files(paths, use_cache=True):
+    """Validate metadata files. Returns {path: errors} and the number of cache hits."""
+    cache = load_cache() if use_cache else {}
+    results = {}
+    hits = 0
+
+    for path in paths:
+        with open(path, "rb") as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+        key = os.path.relpath(path, REPO_ROOT)
+
+        cached = cache.get(key)
+        if cached and cached["sha256"] == digest:
+            errors = cached["errors"]
+            hits += 1
+        else:
+            errors = validate_text(content.decode("utf-8"))
+
+        results[key] = {"sha256": digest, "errors": errors}
+
+    if use_cache:
+        cache.update(results)
+        save_cache(cache)
+
+    return {key: result["errors"] for key, result in results.items()}, hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate the structure of metadata.yaml files.")
+    parser.add_argument("yaml_files", nargs="*")
+    parser.add_argument("--no-cache", action="store_true", help="ignore and do not update the result cache")
+    args = parser.parse_args()
+
+    paths = args.yaml_files or sorted(glob.glob(os.path.join(REPO_ROOT, "knowledge-graphs", "*", "metadata.yaml")))
+
+    start = time.monotonic()
+    results, hits = validate_files(paths, use_cache=not args.no_cache)
+    duration = time.monotonic() - start
+
+    invalid = 0
+    for path, errors in results.items():
+        if not errors:
+            print(f"✅ {path}")
+            continue
+
+        invalid += 1
+        print(f"❌ {path}: {len(errors)} problems")
+        for error in errors:
+            print(f"  - {error}")
+
+    print(f"\n📋 {len(results)} files checked in {duration:.2f}s ({hits} from cache), {invalid} invalid")
+
+    if invalid:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,59 @@
+import json
 import os
 import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from pathlib import Path
 from urllib.parse import urlparse
 
+import requests
 import yaml
 
+from validate_metadata import DISTRIBUTION, compile_schema
+
 
 body = os.environ.get("ISSUE_BODY", "")
 
 errors = []
 warnings = []
 
+# Distribution URLs probed after the field checks
+file_urls = []
+
+
+# Concurrent probes in total and per host
+PROBE_WORKERS = 16
+PER_HOST_LIMIT = 4
+
+# Seconds for one probe and for all probes together
+PROBE_TIMEOUT = 15
+TIME_BUDGET = 60
+
+# The catalog's distribution rules (size, sha256, status, ...), so a
+# merged submission never fails validate_metadata.py; file is checked below
+check_distribution = compile_schema(
+    dict(
+        DISTRIBUTION,
+        required=[],
+        keys={
+            key: rule
+            for key, rule in DISTRIBUTION["keys"].items()
+            if key != "file"
+        }
+    )
+)
+
+# Sizes and ETags found while probing, read by generate_metadata.py
+PROBE_RESULTS_FILE = os.environ.get(
+    "KG_PROBE_RESULTS",
+    os.path.join(
+        tempfile.gettempdir(),
+        "kg-distribution-probes.json"
+    )
+)
+
 
 def get_field(name):
     pattern = rf"### {re.escape(name)}\s*\n\s*(.*?)(?=\n### |\Z)"
@@ -84,6 +127,105 @@ def add_warning(message):
     warnings.append(message)
 
 
+def probe_url(url, host_limits, deadline):
+    """
+    HEAD a distribution URL (GET if HEAD is not allowed).
+    Returns a dict with status or error, size and etag,
+    or None if the time budget ran out first.
+    """
+
+    with host_limits[urlparse(url).netloc]:
+
+        remaining = deadline - time.monotonic()
+
+        if remaining <= 0:
+            return None
+
+
+        timeout = min(
+            PROBE_TIMEOUT,
+            remaining
+        )
+
+        try:
+
+            response = requests.head(
+                url,
+                allow_redirects=True,
+                timeout=timeout
+            )
+
+            if response.status_code in (403, 405, 501):
+
+                response = requests.get(
+                    url,
+                    allow_redirects=True,
+                    stream=True,
+                    timeout=timeout
+                )
+                response.close()
+
+        except requests.RequestException as e:
+
+            return {"error": str(e)}
+
+
+    size = response.headers.get(
+        "Content-Length"
+    )
+
+    return {
+        "status": response.status_code,
+        "size": int(size) if size and size.isdigit() else None,
+        "etag": response.headers.get("ETag"),
+    }
+
+
+def probe_urls(urls):
+    """
+    Probe all URLs concurrently, at most PER_HOST_LIMIT
+    at a time per host and within TIME_BUDGET seconds.
+    URLs not probed in time map to None.
+    """
+
+    host_limits = {
+        urlparse(url).netloc: threading.BoundedSemaphore(PER_HOST_LIMIT)
+        for url in urls
+    }
+
+    deadline = time.monotonic() + TIME_BUDGET
+
+    pool = ThreadPoolExecutor(
+        max_workers=PROBE_WORKERS
+    )
+
+    futures = {
+        url: pool.submit(
+            probe_url,
+            url,
+            host_limits,
+            deadline
+        )
+        for url in urls
+    }
+
+    wait(
+        futures.values(),
+        timeout=TIME_BUDGET + 1
+    )
+
+    # Do not wait for stalled probes
+    pool.shutdown(
+        wait=False,
+        cancel_futures=True
+    )
+
+    return {
+        url: future.result() if future.done() and not future.cancelled() else None
+        for url, future in futures.items()
+    }
+
+
 def kg_id_exists(kg_id):
     """
     Check if KG metadata already exists.
@@ -458,6 +600,12 @@ else:
                                 f"{dp}: invalid file URL."
                             )
 
+                        else:
+
+                            file_urls.append(
+                                (dp, dist["file"])
+                            )
+
 
                         if "format" not in dist:
 
@@ -466,6 +614,21 @@ else:
                             )
 
 
+                        dist_errors = []
+
+                        check_distribution(
+                            dist,
+                            dp,
+                            dist_errors
+                        )
+
+                        for error in dist_errors:
+
+                            add_error(
+                                error
+                            )
+
+
     except yaml.YAMLError as e:
 
         add_error(
@@ -473,6 +636,64 @@ else:
         )
 
 
+# --------------------------------------------------
+# Distribution reachability
+# --------------------------------------------------
+
+if file_urls:
+
+    probes = probe_urls(
+        sorted({url for _, url in file_urls})
+    )
+
+
+    for dp, url in file_urls:
+
+        probe = probes[url]
+
+
+        if probe is None:
+
+            add_warning(
+                f"{dp}: could not be checked within {TIME_BUDGET}s: {url}"
+            )
+
+        elif "error" in probe:
+
+            add_warning(
+                f"{dp}: file is not reachable ({probe['error']}): {url}"
+            )
+
+        elif probe["status"] in (404, 410):
+
+            add_error(
+                f"{dp}: file not found (HTTP {probe['status']}): {url}"
+            )
+
+        elif probe["status"] >= 400:
+
+            add_warning(
+                f"{dp}: file returned HTTP {probe['status']}: {url}"
+            )
+
+
+    with open(
+        PROBE_RESULTS_FILE,
+        "w",
+        encoding="utf-8"
+    ) as f:
+
+        json.dump(
+            {
+                url: probe
+                for url, probe in probes.items()
+                if probe and probe.get("status") == 200
+            },
+            f,
+            indent=2
+        )
+
+
 # --------------------------------------------------
 # Create validation result
 # --------------------------------------------------